@@ -10,9 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import sys
 from pathlib import Path
 from decouple import config
 
+from .test_utils import DisableMigrations
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -55,6 +58,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'forum.middleware.AdminFlagMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -122,6 +126,27 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# `manage.py test`, or a runner that drives the test suite in-process (run_tests.py)
+TESTING = (len(sys.argv) > 1 and sys.argv[1] == 'test') or config('DJANGO_TESTING', cast=bool, default=False)
+
+if TESTING:
+    # Nearly every test creates users; PBKDF2 would dominate the suite's run time
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+    # Tests drive failed sends and bad requests on purpose; drop the resulting
+    # log records instead of formatting them onto the console
+    LOGGING = {
+        'version': 1,
+        'disable_existing_loggers': False,
+        'handlers': {'null': {'class': 'logging.NullHandler'}},
+        'root': {'handlers': ['null']},
+    }
+
+
+# Build the test schema straight from the models instead of replaying every
+# migration; set TEST_WITH_MIGRATIONS=True to exercise the migrations as well
+if TESTING and not config('TEST_WITH_MIGRATIONS', cast=bool, default=False):
+    MIGRATION_MODULES = DisableMigrations()
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -202,6 +227,10 @@ MAILJET_FROM_NAME = config('MAILJET_FROM_NAME', default='Jacaranda Talk')
 # Email rate limit (seconds between OTP sends per user)
 EMAIL_RATE_LIMIT_SECONDS = config('EMAIL_RATE_LIMIT_SECONDS', default=10, cast=int)
 
+# Background OTP email dispatch (api.tasks); eager mode sends inline
+EMAIL_TASK_WORKERS = config('EMAIL_TASK_WORKERS', default=2, cast=int)
+EMAIL_TASKS_ALWAYS_EAGER = config('EMAIL_TASKS_ALWAYS_EAGER', cast=bool, default=False)
+
 # In-memory cache for OTP storage
 CACHES = {
     'default': {
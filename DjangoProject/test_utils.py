@@ -0,0 +1,17 @@
+"""
+Helpers shared by the test settings in settings.py and test_config.py.
+"""
+
+
+class DisableMigrations:
+    """MIGRATION_MODULES stand-in that marks every app as unmigrated.
+
+    A defaultdict would not do: the loader checks ``app_label in
+    MIGRATION_MODULES`` before indexing.
+    """
+
+    def __contains__(self, app_label):
+        return True
+
+    def __getitem__(self, app_label):
+        return None
@@ -26,23 +26,24 @@ from api.serializers import (
 class UserSerializerTest(TestCase):
     """Test cases for UserSerializer."""
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        self.user = User.objects.create_user(
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='testpass123'
         )
-        self.category = Category.objects.create(name='Academic')
-        self.thread = Thread.objects.create(
-            user_id=self.user,
-            category_id=self.category,
+        cls.category = Category.objects.create(name='Academic')
+        cls.thread = Thread.objects.create(
+            user_id=cls.user,
+            category_id=cls.category,
             title='Test Thread',
             body='Test body'
         )
-        self.reply = Reply.objects.create(
-            thread_id=self.thread,
-            user_id=self.user,
+        cls.reply = Reply.objects.create(
+            thread_id=cls.thread,
+            user_id=cls.user,
             body='Test reply'
         )
     
@@ -85,9 +86,10 @@ class UserSerializerTest(TestCase):
 class CategorySerializerTest(TestCase):
     """Test cases for CategorySerializer."""
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        self.category = Category.objects.create(name='Academic')
+        cls.category = Category.objects.create(name='Academic')
     
     def test_category_serialization(self):
         """Test category serialization."""
@@ -176,22 +178,23 @@ class TagCreateSerializerTest(TestCase):
 class TagSerializerTest(TestCase):
     """Test cases for TagSerializer."""
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        self.tag = Tag.objects.create(name='python')
-        self.user = User.objects.create_user(
+        cls.tag = Tag.objects.create(name='python')
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='testpass123'
         )
-        self.category = Category.objects.create(name='Academic')
-        self.thread = Thread.objects.create(
-            user_id=self.user,
-            category_id=self.category,
+        cls.category = Category.objects.create(name='Academic')
+        cls.thread = Thread.objects.create(
+            user_id=cls.user,
+            category_id=cls.category,
             title='Test Thread',
             body='Test body'
         )
-        ThreadTags.objects.create(thread_id=self.thread, tag_id=self.tag)
+        ThreadTags.objects.create(thread_id=cls.thread, tag_id=cls.tag)
     
     def test_tag_serialization(self):
         """Test tag serialization."""
@@ -223,24 +226,25 @@ class TagSerializerTest(TestCase):
 class ThreadTagsSerializerTest(TestCase):
     """Test cases for ThreadTagsSerializer."""
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        self.user = User.objects.create_user(
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='testpass123'
         )
-        self.category = Category.objects.create(name='Academic')
-        self.thread = Thread.objects.create(
-            user_id=self.user,
-            category_id=self.category,
+        cls.category = Category.objects.create(name='Academic')
+        cls.thread = Thread.objects.create(
+            user_id=cls.user,
+            category_id=cls.category,
             title='Test Thread',
             body='Test body'
         )
-        self.tag = Tag.objects.create(name='python')
-        self.thread_tag = ThreadTags.objects.create(
-            thread_id=self.thread,
-            tag_id=self.tag
+        cls.tag = Tag.objects.create(name='python')
+        cls.thread_tag = ThreadTags.objects.create(
+            thread_id=cls.thread,
+            tag_id=cls.tag
         )
     
     def test_thread_tags_serialization(self):
@@ -255,22 +259,23 @@ class ThreadTagsSerializerTest(TestCase):
 class ThreadSerializerTest(TestCase):
     """Test cases for ThreadSerializer."""
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        self.user = User.objects.create_user(
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='testpass123'
         )
-        self.category = Category.objects.create(name='Academic')
-        self.tag = Tag.objects.create(name='python')
-        self.thread = Thread.objects.create(
-            user_id=self.user,
-            category_id=self.category,
+        cls.category = Category.objects.create(name='Academic')
+        cls.tag = Tag.objects.create(name='python')
+        cls.thread = Thread.objects.create(
+            user_id=cls.user,
+            category_id=cls.category,
             title='Test Thread',
             body='Test body'
         )
-        ThreadTags.objects.create(thread_id=self.thread, tag_id=self.tag)
+        ThreadTags.objects.create(thread_id=cls.thread, tag_id=cls.tag)
     
     def test_thread_serialization(self):
         """Test thread serialization."""
@@ -454,22 +459,23 @@ class ThreadSerializerTest(TestCase):
 class ThreadListSerializerTest(TestCase):
     """Test cases for ThreadListSerializer."""
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        self.user = User.objects.create_user(
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='testpass123'
         )
-        self.category = Category.objects.create(name='Academic')
-        self.tag = Tag.objects.create(name='python')
-        self.thread = Thread.objects.create(
-            user_id=self.user,
-            category_id=self.category,
+        cls.category = Category.objects.create(name='Academic')
+        cls.tag = Tag.objects.create(name='python')
+        cls.thread = Thread.objects.create(
+            user_id=cls.user,
+            category_id=cls.category,
             title='Test Thread',
             body='Test body'
         )
-        ThreadTags.objects.create(thread_id=self.thread, tag_id=self.tag)
+        ThreadTags.objects.create(thread_id=cls.thread, tag_id=cls.tag)
     
     def test_thread_list_serialization(self):
         """Test thread list serialization."""
@@ -501,23 +507,24 @@ class ThreadListSerializerTest(TestCase):
 class ReplySerializerTest(TestCase):
     """Test cases for ReplySerializer."""
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        self.user = User.objects.create_user(
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='testpass123'
         )
-        self.category = Category.objects.create(name='Academic')
-        self.thread = Thread.objects.create(
-            user_id=self.user,
-            category_id=self.category,
+        cls.category = Category.objects.create(name='Academic')
+        cls.thread = Thread.objects.create(
+            user_id=cls.user,
+            category_id=cls.category,
             title='Test Thread',
             body='Test body'
         )
-        self.reply = Reply.objects.create(
-            thread_id=self.thread,
-            user_id=self.user,
+        cls.reply = Reply.objects.create(
+            thread_id=cls.thread,
+            user_id=cls.user,
             body='Test reply'
         )
     
@@ -650,23 +657,24 @@ class ReplySerializerTest(TestCase):
 class ThreadLikeSerializerTest(TestCase):
     """Test cases for ThreadLikeSerializer."""
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        self.user = User.objects.create_user(
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='testpass123'
         )
-        self.category = Category.objects.create(name='Academic')
-        self.thread = Thread.objects.create(
-            user_id=self.user,
-            category_id=self.category,
+        cls.category = Category.objects.create(name='Academic')
+        cls.thread = Thread.objects.create(
+            user_id=cls.user,
+            category_id=cls.category,
             title='Test Thread',
             body='Test body'
         )
-        self.thread_like = ThreadLike.objects.create(
-            user_id=self.user,
-            thread_id=self.thread
+        cls.thread_like = ThreadLike.objects.create(
+            user_id=cls.user,
+            thread_id=cls.thread
         )
     
     def test_thread_like_serialization(self):
@@ -699,28 +707,29 @@ class ThreadLikeSerializerTest(TestCase):
 class ReplyLikeSerializerTest(TestCase):
     """Test cases for ReplyLikeSerializer."""
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        self.user = User.objects.create_user(
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='testpass123'
         )
-        self.category = Category.objects.create(name='Academic')
-        self.thread = Thread.objects.create(
-            user_id=self.user,
-            category_id=self.category,
+        cls.category = Category.objects.create(name='Academic')
+        cls.thread = Thread.objects.create(
+            user_id=cls.user,
+            category_id=cls.category,
             title='Test Thread',
             body='Test body'
         )
-        self.reply = Reply.objects.create(
-            thread_id=self.thread,
-            user_id=self.user,
+        cls.reply = Reply.objects.create(
+            thread_id=cls.thread,
+            user_id=cls.user,
             body='Test reply'
         )
-        self.reply_like = ReplyLike.objects.create(
-            user_id=self.user,
-            reply_id=self.reply
+        cls.reply_like = ReplyLike.objects.create(
+            user_id=cls.user,
+            reply_id=cls.reply
         )
     
     def test_reply_like_serialization(self):
@@ -752,14 +761,15 @@ class ReplyLikeSerializerTest(TestCase):
 class SerializerValidationTest(TestCase):
     """Test cases for serializer validation edge cases."""
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        self.user = User.objects.create_user(
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='testpass123'
         )
-        self.category = Category.objects.create(name='Academic')
+        cls.category = Category.objects.create(name='Academic')
     
     def test_thread_title_length_validation(self):
         """Test thread title length validation."""
@@ -837,30 +847,31 @@ class SerializerValidationTest(TestCase):
 class SerializerContextTest(TestCase):
     """Test cases for serializer context handling."""
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        self.user = User.objects.create_user(
+        cls.user = User.objects.create_user(
             username='testuser',
             email='test@example.com',
             password='testpass123'
         )
-        self.admin_user = User.objects.create_user(
+        cls.admin_user = User.objects.create_user(
             username='admin',
             email='admin@example.com',
             password='adminpass123',
             is_admin=True
         )
-        self.category = Category.objects.create(name='Academic')
-        self.thread = Thread.objects.create(
-            user_id=self.user,
-            category_id=self.category,
+        cls.category = Category.objects.create(name='Academic')
+        cls.thread = Thread.objects.create(
+            user_id=cls.user,
+            category_id=cls.category,
             title='Test Thread',
             body='Test body',
             is_anonymous=True
         )
-        self.reply = Reply.objects.create(
-            thread_id=self.thread,
-            user_id=self.user,
+        cls.reply = Reply.objects.create(
+            thread_id=cls.thread,
+            user_id=cls.user,
             body='Test reply',
             is_anonymous=True
         )
@@ -225,12 +225,7 @@ class ThreadSerializer(serializers.ModelSerializer):
         thread = Thread.objects.create(category_id=category, **validated_data)
         
         # Add tags to the thread (create new tags if they don't exist)
-        for tag_name in tag_names:
-            tag, created = Tag.objects.get_or_create(
-                name=tag_name,
-                defaults={'is_active': True}
-            )
-            ThreadTags.objects.get_or_create(thread_id=thread, tag_id=tag)
+        self._attach_tags(thread, tag_names)
         
         return thread
     
@@ -260,14 +255,30 @@ class ThreadSerializer(serializers.ModelSerializer):
             # Remove existing tags
             ThreadTags.objects.filter(thread_id=instance).delete()
             # Add new tags (create new tags if they don't exist)
-            for tag_name in tag_names:
-                tag, created = Tag.objects.get_or_create(
-                    name=tag_name,
-                    defaults={'is_active': True}
-                )
-                ThreadTags.objects.get_or_create(thread_id=instance, tag_id=tag)
+            self._attach_tags(instance, tag_names)
         
         return instance
+    
+    @staticmethod
+    def _attach_tags(thread, tag_names):
+        """
+        Link tags to a thread, creating missing tags as active.
+        
+        Two INSERT ... ON CONFLICT DO NOTHING statements replace a get_or_create
+        pair per tag. bulk_create skips Tag.save, so the tag list cache is
+        invalidated here.
+        """
+        if not tag_names:
+            return
+        Tag.objects.bulk_create(
+            [Tag(name=tag_name, is_active=True) for tag_name in tag_names],
+            ignore_conflicts=True,
+        )
+        ThreadTags.objects.bulk_create(
+            [ThreadTags(thread_id=thread, tag_id=Tag(name=tag_name)) for tag_name in tag_names],
+            ignore_conflicts=True,
+        )
+        Tag.invalidate_list_cache()
 
 
 class ReplySerializer(serializers.ModelSerializer):
@@ -288,7 +299,10 @@ class ReplySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'create_time', 'edit_time', 'is_deleted']
     
     def get_like_count(self, obj):
-        """Get the number of likes for this reply."""
+        """Get the number of likes for this reply (annotated by list querysets when available)."""
+        active_like_count = getattr(obj, 'active_like_count', None)
+        if active_like_count is not None:
+            return active_like_count
         return ReplyLike.objects.filter(reply_id=obj, status=True).count()
     
     def get_author_display_name(self, obj):
@@ -0,0 +1,50 @@
+"""
+Background tasks for the API.
+
+OTP emails are sent on a small worker pool once the request's transaction has
+committed, so login and resend responses do not wait on Mailjet/SMTP. The pool
+is shut down with wait=True at exit, so a graceful worker reload (uwsgi
+max-requests) finishes pending sends first; the OTP being delivered lives in
+this process's cache, so it could not outlive the process anyway. Set
+EMAIL_TASKS_ALWAYS_EAGER to run tasks inline instead (tests, debugging).
+"""
+import atexit
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+
+from forum.email_service import EmailSendResult, email_service
+
+logger = logging.getLogger(__name__)
+
+_email_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'EMAIL_TASK_WORKERS', 2),
+    thread_name_prefix='email-task',
+)
+atexit.register(_email_executor.shutdown, wait=True)
+
+
+def send_otp_task(user_id, email, otp, rate_limit=True):
+    """Make one OTP send attempt; failures are logged and returned."""
+    try:
+        result = email_service.send_otp(to_email=email, otp_code=otp, user_id=user_id, rate_limit=rate_limit)
+    except Exception as e:
+        logger.error(f"OTP send raised for user {user_id}: {e}")
+        result = EmailSendResult(False, 'unknown', error=str(e))
+    if not result.success:
+        logger.error(f"Failed to send OTP email to user {user_id}: {result.error}")
+    return result
+
+
+def enqueue_on_commit(task, *args, **kwargs):
+    """Run task on the email worker pool after the current transaction commits."""
+    transaction.on_commit(lambda: _submit(task, *args, **kwargs))
+
+
+def _submit(task, *args, **kwargs):
+    if getattr(settings, 'EMAIL_TASKS_ALWAYS_EAGER', False):
+        task(*args, **kwargs)
+        return
+    _email_executor.submit(task, *args, **kwargs)
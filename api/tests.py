@@ -6,7 +6,7 @@ thread management, reply management, user management, and search functionality.
 Tests cover both success and error scenarios, permissions, and edge cases.
 """
 
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from django.core.cache import cache
@@ -15,7 +15,9 @@ from rest_framework import status
 from rest_framework.authtoken.models import Token
 from unittest.mock import patch, MagicMock
 import json
+import threading
 
+from forum.email_service import EmailSendResult
 from forum.models import (
     User, Category, Tag, Thread, Reply, ThreadTags, 
     ThreadLike, ReplyLike, ThreadView
@@ -48,22 +50,55 @@ class AuthenticationAPITest(APITestCase):
         """Clean up after each test."""
         cache.clear()
     
-    @patch('api.views.email_service.send_otp_with_retry')
+    @override_settings(EMAIL_TASKS_ALWAYS_EAGER=True)
+    @patch('api.views.email_service.send_otp')
     def test_login_success(self, mock_send_otp):
         """Test successful login with OTP."""
-        mock_send_otp.return_value = {'success': True, 'method': 'mailjet'}
+        mock_send_otp.return_value = EmailSendResult(True, 'mailjet')
         
         data = {
             'email': 'test@example.com',
             'password': 'testpass123'
         }
         
-        response = self.client.post('/api/auth/login/', data)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/auth/login/', data)
+            # Nothing is sent until the request's transaction commits
+            mock_send_otp.assert_not_called()
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['mfa_required'])
         self.assertEqual(response.data['user_id'], self.user.id)
-        self.assertEqual(response.data['email_status'], 'sent')
+        self.assertEqual(response.data['email_status'], 'queued')
+        mock_send_otp.assert_called_once_with(
+            to_email='test@example.com',
+            otp_code=cache.get(f'auth:otp:{self.user.id}'),
+            user_id=self.user.id,
+            rate_limit=True
+        )
+    
+    @patch('api.views.email_service.send_otp')
+    def test_login_does_not_wait_for_email_provider(self, mock_send_otp):
+        """Test the OTP email is sent on the worker pool while the provider is still busy."""
+        release = threading.Event()
+        sent = threading.Event()
+        
+        def slow_send(**kwargs):
+            release.wait(timeout=5)
+            sent.set()
+            return EmailSendResult(True, 'mailjet')
+        mock_send_otp.side_effect = slow_send
+        
+        data = {'email': 'test@example.com', 'password': 'testpass123'}
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/auth/login/', data)
+        
+        # The commit hook returned while the provider call is still blocked
+        self.assertEqual(response.data['email_status'], 'queued')
+        self.assertFalse(sent.is_set())
+        release.set()
+        self.assertTrue(sent.wait(timeout=5))
+        mock_send_otp.assert_called_once()
     
     def test_login_invalid_credentials(self):
         """Test login with invalid credentials."""
@@ -77,6 +112,20 @@ class AuthenticationAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
         self.assertIn('error', response.data)
     
+    @patch('api.views.email_service.send_otp')
+    def test_login_unknown_email_then_registered(self, mock_send_otp):
+        """Test a cached unknown-email result is dropped once the account exists."""
+        mock_send_otp.return_value = EmailSendResult(True, 'mailjet')
+        data = {'email': 'late@example.com', 'password': 'testpass123'}
+        
+        response = self.client.post('/api/auth/login/', data)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        
+        User.objects.create_user(username='late', email='late@example.com', password='testpass123')
+        response = self.client.post('/api/auth/login/', data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['mfa_required'])
+    
     def test_login_missing_fields(self):
         """Test login with missing fields."""
         data = {'email': 'test@example.com'}
@@ -117,6 +166,53 @@ class AuthenticationAPITest(APITestCase):
         self.assertTrue(response.data['success'])
         self.assertEqual(response.data['user_id'], self.user.id)
     
+    def test_verify_otp_single_use(self):
+        """Test an OTP cannot be used twice."""
+        cache.set(f'auth:otp:{self.user.id}', '123456', timeout=300)
+        data = {'user_id': self.user.id, 'otp': '123456'}
+        
+        response = self.client.post('/api/auth/verify-otp/', data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        response = self.client.post('/api/auth/verify-otp/', data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    @override_settings(EMAIL_TASKS_ALWAYS_EAGER=True)
+    @patch('forum.email_service.email_service.mailjet_service.send_otp_email')
+    def test_resend_otp_rate_limited_and_ban_invalidates_meta(self, mock_send_email):
+        """Test resend is rate limited and a ban is seen despite cached user meta."""
+        mock_send_email.return_value = EmailSendResult(True, 'mailjet')
+        data = {'user_id': self.user.id}
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/auth/resend-otp/', data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['email_status'], 'queued')
+        
+        response = self.client.post('/api/auth/resend-otp/', data)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(mock_send_email.call_count, 1)
+        
+        cache.delete(f'email:rate_limit:{self.user.id}')
+        self.user.is_banned = True
+        self.user.save()
+        response = self.client.post('/api/auth/resend-otp/', data)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+    
+    @override_settings(EMAIL_TASKS_ALWAYS_EAGER=True)
+    @patch('forum.email_service.time.sleep')
+    @patch('forum.email_service.email_service.mailjet_service.send_otp_email')
+    def test_resend_otp_failed_send_not_retried(self, mock_send_email, mock_sleep):
+        """Test a failed OTP send is attempted once and never sleeps."""
+        mock_send_email.return_value = EmailSendResult(False, 'fallback', error='SMTP unavailable')
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/auth/resend-otp/', {'user_id': self.user.id})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(mock_send_email.call_count, 1)
+        mock_sleep.assert_not_called()
+    
     def test_verify_otp_invalid(self):
         """Test OTP verification with invalid OTP."""
         cache.set(f'auth:otp:{self.user.id}', '123456', timeout=300)
@@ -174,6 +270,23 @@ class AuthenticationAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn('error', response.data)
     
+    def test_register_duplicate_username_and_email(self):
+        """Test an email clash is reported before a username clash on another account."""
+        data = {
+            'email': 'test@example.com',
+            'username': 'admin',
+            'password': 'ComplexPass123!',
+            'confirm_password': 'ComplexPass123!'
+        }
+        
+        response = self.client.post('/api/auth/register/', data)
+        self.assertEqual(response.data['error'], 'Email already exists')
+        
+        data['email'] = 'fresh@example.com'
+        response = self.client.post('/api/auth/register/', data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['error'], 'Username already exists')
+    
     def test_register_password_mismatch(self):
         """Test registration with password mismatch."""
         data = {
@@ -210,10 +323,60 @@ class AuthenticationAPITest(APITestCase):
     def test_whoami_unauthenticated(self):
         """Test whoami endpoint for unauthenticated user."""
         response = self.client.get('/api/auth/whoami/')
-        
+
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertFalse(response.data['logged_in'])
 
+    def test_whoami_cache_invalidation(self):
+        """Test cached whoami payload is refreshed on profile changes and logout."""
+        self.client.force_login(self.user)
+
+        response = self.client.get('/api/auth/whoami/')
+        self.assertTrue(response.data['logged_in'])
+        self.assertFalse(response.data['is_anonymous'])
+
+        self.client.post('/api/auth/toggle-anonymous/', {'is_anonymous': True}, format='json')
+        response = self.client.get('/api/auth/whoami/')
+        self.assertTrue(response.data['is_anonymous'])
+
+        self.client.post('/api/auth/logout/')
+        response = self.client.get('/api/auth/whoami/')
+        self.assertFalse(response.data['logged_in'])
+
+    def test_whoami_cache_follows_changes_from_other_sessions(self):
+        """Test a cached whoami payload is not served after a ban or password change elsewhere."""
+        self.client.force_login(self.user)
+        self.assertTrue(self.client.get('/api/auth/whoami/').data['logged_in'])
+
+        user = User.objects.get(pk=self.user.pk)
+        user.is_banned = True
+        user.save(update_fields=['is_banned'])
+        self.assertFalse(self.client.get('/api/auth/whoami/').data['logged_in'])
+
+        user.is_banned = False
+        user.save(update_fields=['is_banned'])
+        self.client.force_login(user)
+        self.assertTrue(self.client.get('/api/auth/whoami/').data['logged_in'])
+
+        user.set_password('newpass456')
+        user.save(update_fields=['password'])
+        self.assertFalse(self.client.get('/api/auth/whoami/').data['logged_in'])
+
+    def test_whoami_etag_not_modified(self):
+        """Test whoami answers 304 to a matching If-None-Match until the payload changes."""
+        self.client.force_login(self.user)
+
+        response = self.client.get('/api/auth/whoami/')
+        etag = response['ETag']
+        response = self.client.get('/api/auth/whoami/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+        self.client.post('/api/auth/toggle-anonymous/', {'is_anonymous': True}, format='json')
+        response = self.client.get('/api/auth/whoami/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['is_anonymous'])
+
 
 class ThreadAPITest(APITestCase):
     """Test cases for Thread API endpoints."""
@@ -242,6 +405,10 @@ class ThreadAPITest(APITestCase):
             'tag_names': ['python', 'django']
         }
     
+    def tearDown(self):
+        """Clean up after each test."""
+        cache.clear()
+    
     def test_create_thread_success(self):
         """Test successful thread creation."""
         self.client.force_authenticate(user=self.user)
@@ -323,7 +490,69 @@ class ThreadAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 1)
         self.assertEqual(response.data['results'][0]['title'], 'Python Thread')
-    
+
+    def test_list_threads_with_search(self):
+        """Test ?search= filters threads by title and body."""
+        Thread.objects.create(
+            user_id=self.user,
+            category_id=self.category,
+            title='Django tips',
+            body='Body 1'
+        )
+        Thread.objects.create(
+            user_id=self.user,
+            category_id=self.category,
+            title='Unrelated',
+            body='Nothing to see here'
+        )
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get('/api/threads/?search=django')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([t['title'] for t in response.data['results']], ['Django tips'])
+
+    def test_list_threads_with_unknown_or_inactive_tag(self):
+        """Test tag filtering returns nothing for unknown or inactive tags."""
+        thread = Thread.objects.create(
+            user_id=self.user,
+            category_id=self.category,
+            title='Python Thread',
+            body='Body 1'
+        )
+        inactive_tag = Tag.objects.create(name='legacy', is_active=False)
+        ThreadTags.objects.create(thread_id=thread, tag_id=inactive_tag)
+
+        self.client.force_authenticate(user=self.user)
+        for tag in ('missing', 'legacy'):
+            with self.subTest(tag=tag):
+                response = self.client.get(f'/api/threads/?tag={tag}')
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(len(response.data['results']), 0)
+
+    def test_list_threads_with_ids_and_category(self):
+        """Test ids and category filters, ignoring malformed values."""
+        other_category = Category.objects.create(name='Social')
+        thread1 = Thread.objects.create(
+            user_id=self.user, category_id=self.category, title='Thread 1', body='Body 1'
+        )
+        thread2 = Thread.objects.create(
+            user_id=self.user, category_id=other_category, title='Thread 2', body='Body 2'
+        )
+        Thread.objects.create(
+            user_id=self.user, category_id=self.category, title='Thread 3', body='Body 3'
+        )
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(f'/api/threads/?ids={thread1.id}, {thread2.id}')
+        self.assertEqual({t['id'] for t in response.data['results']}, {thread1.id, thread2.id})
+
+        response = self.client.get(f'/api/threads/?ids={thread1.id},{thread2.id}&category={other_category.id}')
+        self.assertEqual([t['id'] for t in response.data['results']], [thread2.id])
+
+        response = self.client.get('/api/threads/?ids=abc&category=xyz')
+        self.assertEqual(len(response.data['results']), 3)
+
     def test_retrieve_thread(self):
         """Test retrieving a specific thread."""
         thread = Thread.objects.create(
@@ -426,6 +655,24 @@ class ThreadAPITest(APITestCase):
         thread.refresh_from_db()
         self.assertTrue(thread.is_deleted)
     
+    def test_delete_thread_non_author_or_missing(self):
+        """Test delete is forbidden for non-authors and 404s for unknown threads."""
+        thread = Thread.objects.create(
+            user_id=self.admin_user,
+            category_id=self.category,
+            title='Test Thread',
+            body='Test body'
+        )
+        
+        self.client.force_authenticate(user=self.user)
+        response = self.client.delete(f'/api/threads/{thread.id}/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        thread.refresh_from_db()
+        self.assertFalse(thread.is_deleted)
+        
+        response = self.client.delete(f'/api/threads/{thread.id + 1000}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+    
     def test_thread_like_toggle(self):
         """Test toggling thread like."""
         thread = Thread.objects.create(
@@ -470,6 +717,27 @@ class ThreadAPITest(APITestCase):
             thread_id=thread
         ).exists())
     
+    def test_thread_viewed_debounced(self):
+        """Test repeat views inside the debounce window skip the DB write."""
+        thread = Thread.objects.create(
+            user_id=self.user,
+            category_id=self.category,
+            title='Test Thread',
+            body='Test body'
+        )
+        
+        self.client.force_authenticate(user=self.user)
+        self.client.post(f'/api/threads/{thread.id}/viewed/')
+        first_viewed_at = ThreadView.objects.get(user_id=self.user, thread_id=thread).viewed_at
+        
+        response = self.client.post(f'/api/threads/{thread.id}/viewed/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['ok'])
+        self.assertEqual(
+            ThreadView.objects.get(user_id=self.user, thread_id=thread).viewed_at,
+            first_viewed_at
+        )
+    
     def test_thread_replies(self):
         """Test getting thread replies."""
         thread = Thread.objects.create(
@@ -489,12 +757,18 @@ class ThreadAPITest(APITestCase):
             user_id=self.user,
             body='Reply 2'
         )
+        ReplyLike.objects.create(reply_id=reply2, user_id=self.user, status=True)
+        ReplyLike.objects.create(reply_id=reply2, user_id=self.admin_user, status=False)
         
         self.client.force_authenticate(user=self.user)
         response = self.client.get(f'/api/threads/{thread.id}/replies/')
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 2)
+        self.assertEqual([r['body'] for r in response.data], ['Reply 1', 'Reply 2'])
+        self.assertEqual([r['like_count'] for r in response.data], [0, 1])
+        self.assertEqual(response.data[0]['thread_title'], 'Test Thread')
+        self.assertEqual(response.data[0]['author']['username'], self.user.username)
     
     def test_thread_restore_admin(self):
         """Test restoring thread by admin."""
@@ -562,6 +836,10 @@ class ReplyAPITest(APITestCase):
             'body': 'This is a test reply.'
         }
     
+    def tearDown(self):
+        """Clean up after each test."""
+        cache.clear()
+    
     def test_create_reply_success(self):
         """Test successful reply creation."""
         self.client.force_authenticate(user=self.user)
@@ -749,6 +1027,10 @@ class UserAPITest(APITestCase):
         )
         self.category = Category.objects.create(name='Academic')
     
+    def tearDown(self):
+        """Clean up after each test."""
+        cache.clear()
+    
     def test_list_users(self):
         """Test listing users."""
         self.client.force_authenticate(user=self.user)
@@ -824,7 +1106,38 @@ class UserAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['thread_count'], 1)
         self.assertEqual(response.data['reply_count'], 1)
-    
+
+    def test_user_stats_like_counts(self):
+        """Test given and received like totals in user statistics."""
+        thread = Thread.objects.create(
+            user_id=self.user,
+            category_id=self.category,
+            title='Test Thread',
+            body='Test body'
+        )
+        other_thread = Thread.objects.create(
+            user_id=self.admin_user,
+            category_id=self.category,
+            title='Other Thread',
+            body='Other body'
+        )
+        reply = Reply.objects.create(
+            thread_id=other_thread,
+            user_id=self.user,
+            body='Test reply'
+        )
+        ThreadLike.objects.create(user_id=self.admin_user, thread_id=thread, status=True)
+        ThreadLike.objects.create(user_id=self.user, thread_id=other_thread, status=True)
+        ThreadLike.objects.create(user_id=self.user, thread_id=thread, status=False)
+        ReplyLike.objects.create(user_id=self.admin_user, reply_id=reply, status=True)
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(f'/api/users/{self.user.id}/stats/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['given_likes'], {'threads': 1, 'replies': 0, 'total': 1})
+        self.assertEqual(response.data['received_likes'], {'threads': 1, 'replies': 1, 'total': 2})
+
     def test_user_history(self):
         """Test getting user browsing history."""
         thread = Thread.objects.create(
@@ -845,6 +1158,29 @@ class UserAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 1)
     
+    def test_user_history_author_names_without_extra_queries(self):
+        """Test history resolves thread authors in the page query (no N+1)."""
+        for i, is_anonymous in enumerate([False, True, False]):
+            thread = Thread.objects.create(
+                user_id=self.admin_user,
+                category_id=self.category,
+                title=f'Thread {i}',
+                body='Test body',
+                is_anonymous=is_anonymous
+            )
+            ThreadView.objects.create(user_id=self.user, thread_id=thread)
+        
+        self.client.force_authenticate(user=self.user)
+        # target user lookup, count, page
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/api/users/{self.user.id}/history/')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            sorted(r['author_display_name'] for r in response.data['results']),
+            sorted([self.admin_user.username, self.admin_user.username, f'Anonymous#{self.admin_user.id}'])
+        )
+    
     def test_user_likes(self):
         """Test getting user liked threads."""
         thread = Thread.objects.create(
@@ -879,10 +1215,11 @@ class UserAPITest(APITestCase):
         )
         
         response = self.client.post(f'/api/users/{self.user.id}/ban/')
-        
+
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertTrue(response.data['success'])
-        
+        self.assertIn('1 threads and 0 replies', response.data['message'])
+
         # Verify user is banned
         self.user.refresh_from_db()
         self.assertTrue(self.user.is_banned)
@@ -891,6 +1228,25 @@ class UserAPITest(APITestCase):
         thread.refresh_from_db()
         self.assertTrue(thread.is_deleted)
     
+    def test_ban_user_like_counts_stay_accurate(self):
+        """Test like counts after a ban only include active likes."""
+        thread = Thread.objects.create(
+            user_id=self.admin_user,
+            category_id=self.category,
+            title='Test Thread',
+            body='Test body'
+        )
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(f'/api/threads/{thread.id}/like/')
+        self.assertEqual(response.data['like_count'], 1)
+        
+        self.client.force_authenticate(user=self.admin_user)
+        self.client.post(f'/api/users/{self.user.id}/ban/')
+        
+        response = self.client.post(f'/api/threads/{thread.id}/like/')
+        self.assertTrue(response.data['liked'])
+        self.assertEqual(response.data['like_count'], 1)
+    
     def test_ban_user_non_admin(self):
         """Test banning user by non-admin."""
         self.client.force_authenticate(user=self.user)
@@ -933,6 +1289,10 @@ class TagAPITest(APITestCase):
             is_admin=True
         )
     
+    def tearDown(self):
+        """Clean up after each test."""
+        cache.clear()
+    
     def test_list_tags(self):
         """Test listing tags."""
         Tag.objects.create(name='python')
@@ -943,6 +1303,23 @@ class TagAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 2)
     
+    def test_list_tags_cached_until_tag_changes(self):
+        """Test the tag list is served from cache and refreshed on tag writes."""
+        tag = Tag.objects.create(name='python')
+        Tag.objects.create(name='django')
+        self.client.get('/api/tags/')
+        
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/tags/')
+        self.assertEqual(len(response.data['results']), 2)
+        
+        self.client.force_authenticate(user=self.admin_user)
+        self.client.post(f'/api/tags/{tag.name}/disable/')
+        self.client.force_authenticate(user=None)
+        
+        response = self.client.get('/api/tags/')
+        self.assertEqual([t['name'] for t in response.data['results']], ['django'])
+    
     def test_create_tag_admin(self):
         """Test creating tag by admin."""
         self.client.force_authenticate(user=self.admin_user)
@@ -1054,6 +1431,10 @@ class SearchAPITest(APITestCase):
             body='Great tutorial! Thanks for sharing.'
         )
     
+    def tearDown(self):
+        """Clean up after each test."""
+        cache.clear()
+    
     def test_search_threads(self):
         """Test searching threads."""
         response = self.client.get('/api/search/?q=python&type=threads')
@@ -1062,6 +1443,126 @@ class SearchAPITest(APITestCase):
         self.assertEqual(response.data['total_threads'], 1)
         self.assertEqual(len(response.data['threads']), 1)
     
+    def test_search_cached_until_new_content(self):
+        """Test repeated searches are served from cache until a thread is written."""
+        url = '/api/search/?q=python&type=threads'
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.data['total_threads'], 1)
+        
+        Thread.objects.create(
+            user_id=self.user,
+            category_id=self.category,
+            title='Advanced Python',
+            body='Decorators and generators.'
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.data['total_threads'], 2)
+    
+    def test_search_cache_refreshed_on_ban(self):
+        """Test cached search results drop a banned user's content and regain it on unban."""
+        admin = User.objects.create_user(
+            username='admin',
+            email='admin@example.com',
+            password='adminpass123',
+            is_admin=True
+        )
+        url = '/api/search/?q=python&type=threads'
+        self.assertEqual(self.client.get(url).data['total_threads'], 1)
+        
+        self.client.force_authenticate(user=admin)
+        self.client.post(f'/api/users/{self.user.id}/ban/')
+        self.assertEqual(self.client.get(url).data['total_threads'], 0)
+        
+        self.client.post(f'/api/users/{self.user.id}/unban/')
+        self.assertEqual(self.client.get(url).data['total_threads'], 1)
+    
+    def test_search_threads_pagination(self):
+        """Test paged search reports totals and whether more results follow."""
+        Thread.objects.create(
+            user_id=self.user,
+            category_id=self.category,
+            title='Advanced Python',
+            body='Decorators and generators.'
+        )
+        
+        response = self.client.get('/api/search/?q=python&type=threads&limit=1&page=1')
+        self.assertEqual(len(response.data['threads']), 1)
+        self.assertEqual(response.data['total_threads'], 2)
+        self.assertTrue(response.data['has_more_threads'])
+        
+        response = self.client.get('/api/search/?q=python&type=threads&limit=1&page=2')
+        self.assertEqual(len(response.data['threads']), 1)
+        self.assertEqual(response.data['total_threads'], 2)
+        self.assertFalse(response.data['has_more_threads'])
+    
+    def test_search_threads_cursor_pagination(self):
+        """Test sort=recent pages can be walked with keyset cursors."""
+        for title in ['Python basics', 'Python testing']:
+            Thread.objects.create(
+                user_id=self.user,
+                category_id=self.category,
+                title=title,
+                body='Notes.'
+            )
+        
+        url = '/api/search/?q=python&type=threads&limit=2'
+        response = self.client.get(url)
+        self.assertEqual([t['title'] for t in response.data['threads']], ['Python testing', 'Python basics'])
+        cursor = response.data['next_threads_cursor']
+        self.assertIsNotNone(cursor)
+        
+        response = self.client.get(f'{url}&threads_after={cursor}')
+        self.assertEqual([t['title'] for t in response.data['threads']], ['Python Programming Guide'])
+        self.assertEqual(response.data['total_threads'], 3)
+        self.assertFalse(response.data['has_more_threads'])
+        self.assertIsNone(response.data['next_threads_cursor'])
+        
+        response = self.client.get(f'{url}&threads_after=not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_search_threads_relevance_sort(self):
+        """Test relevance sort ranks title matches above newer body-only matches."""
+        Thread.objects.create(
+            user_id=self.user,
+            category_id=self.category,
+            title='Weekend plans',
+            body='Maybe some python later.'
+        )
+        
+        response = self.client.get('/api/search/?q=python&type=threads&sort=relevance')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [t['title'] for t in response.data['threads']],
+            ['Python Programming Guide', 'Weekend plans']
+        )
+    
+    def test_search_relevance_treats_wildcards_literally(self):
+        """Test LIKE wildcards in the query are matched literally by the relevance sort."""
+        Thread.objects.create(
+            user_id=self.user,
+            category_id=self.category,
+            title='Older news',
+            body='Tickets are 100% sold out.'
+        )
+        Thread.objects.create(
+            user_id=self.user,
+            category_id=self.category,
+            title='Sale: 100% refund',
+            body='Details inside.'
+        )
+        
+        response = self.client.get('/api/search/?q=100%25&type=all&sort=relevance')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [t['title'] for t in response.data['threads']],
+            ['Sale: 100% refund', 'Older news']
+        )
+        self.assertEqual(response.data['total_replies'], 0)
+    
     def test_search_replies(self):
         """Test searching replies."""
         response = self.client.get('/api/search/?q=tutorial&type=replies')
@@ -15,22 +15,27 @@ from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser, B
 class IsCustomAdminUser(BasePermission):
     """Custom permission to only allow admin users."""
     def has_permission(self, request, view):
-        return bool(request.user and request.user.is_authenticated and 
-                   (request.user.is_admin or request.user.is_staff or request.user.is_superuser))
+        return bool(request.is_admin_user)
 from rest_framework.authentication import SessionAuthentication, TokenAuthentication
-from rest_framework.filters import OrderingFilter, SearchFilter
-from django.contrib.auth import authenticate, login, logout
+from rest_framework.filters import BaseFilterBackend, OrderingFilter, SearchFilter
+from rest_framework.settings import api_settings
+from django.contrib.auth import HASH_SESSION_KEY, SESSION_KEY, authenticate, login, logout
 from django.core.cache import cache
 from django.core.mail import send_mail
+from forum.authentication import find_user_by_login
 from forum.email_service import email_service
+from .tasks import enqueue_on_commit, send_otp_task
 import logging
 from django.conf import settings
 from django.views.decorators.csrf import csrf_exempt, ensure_csrf_cookie
 from django.utils.decorators import method_decorator
-from django.db.models import Q, Count
+from django.db import connection, transaction
+from django.db.models import Q, Count, Case, When, Value, IntegerField
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
 from django.utils import timezone
-from django.views.decorators.csrf import ensure_csrf_cookie
-from forum.models import User, Thread, Reply, Tag, Category, ThreadLike, ReplyLike, ThreadTags, ThreadView
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
+from forum.models import User, Thread, Reply, Tag, Category, ThreadLike, ReplyLike, ThreadTags, ThreadView, bump_search_cache_version, search_cache_version
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError as DjangoValidationError
 from .serializers import (
@@ -38,32 +43,201 @@ from .serializers import (
     CategorySerializer, ThreadLikeSerializer, ReplyLikeSerializer,
     ThreadListSerializer
 )
+import base64
+import binascii
+import hashlib
 import json
+import secrets
+from datetime import datetime
 # from forum.models import Thread, Reply, Tag, Category, ThreadLike, ReplyLike
 
+logger = logging.getLogger(__name__)
 
-class WhoAmIAPIView(APIView):
+# whoami payloads are cached per user for a short time; User.save drops them
+WHOAMI_CACHE_TIMEOUT = 60  # seconds
+_ANON_WHOAMI_PAYLOAD = {'logged_in': False}
+
+# repeat thread views by the same user within this window skip the DB write
+THREAD_VIEW_DEBOUNCE_TIMEOUT = 60  # seconds
+
+# unfiltered tag lists are cached; Tag.save/delete invalidate them
+TAG_LIST_CACHE_TIMEOUT = 60  # seconds
+
+# search result totals are cached per query so paging does not re-run COUNT
+SEARCH_COUNT_CACHE_TIMEOUT = 60  # seconds
+
+# whole search responses are cached briefly; thread/reply writes retire them
+SEARCH_PAGE_CACHE_TIMEOUT = 30  # seconds
+
+# .only() projections matching the columns the list serializers render
+_AUTHOR_ONLY_FIELDS = (
+    'user_id__id', 'user_id__username', 'user_id__email', 'user_id__is_admin',
+    'user_id__is_staff', 'user_id__is_superuser', 'user_id__is_anonymous',
+    'user_id__is_active', 'user_id__is_banned', 'user_id__create_time',
+    'user_id__update_time',
+)
+THREAD_LIST_ONLY_FIELDS = (
+    'id', 'title', 'is_anonymous', 'create_time', 'is_deleted',
+    'category_id__id', 'category_id__name',
+) + _AUTHOR_ONLY_FIELDS
+# thread columns behind the history/likes payloads, including what
+# Thread.get_author_display_name reads from the joined author
+HISTORY_THREAD_ONLY_FIELDS = (
+    'thread_id__id', 'thread_id__title', 'thread_id__is_anonymous',
+    'thread_id__user_id__id', 'thread_id__user_id__username',
+)
+REPLY_ONLY_FIELDS = (
+    'id', 'body', 'is_anonymous', 'create_time', 'edit_time', 'is_deleted',
+    'thread_id__id', 'thread_id__title',
+) + _AUTHOR_ONLY_FIELDS
+
+
+def _generate_otp():
+    """Return a 6-digit one-time password from a cryptographically secure source."""
+    return f"{secrets.randbelow(900000) + 100000}"
+
+
+def _encode_search_cursor(row):
+    """Opaque keyset cursor pointing just past row in a newest-first listing."""
+    raw = f"{row.create_time.isoformat()}|{row.pk}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def _decode_search_cursor(cursor):
+    """Return (create_time, pk) from a search cursor; raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+    except (binascii.Error, UnicodeError) as e:
+        raise ValueError(str(e))
+    created, _, pk = raw.partition('|')
+    return datetime.fromisoformat(created), int(pk)
+
+
+def _otp_rate_limited_response():
+    """429 telling the client to wait out EMAIL_RATE_LIMIT_SECONDS before another OTP."""
+    rate_limit_seconds = email_service.rate_limit_seconds
+    return Response({
+        'success': False,
+        'error': f'OTP requests are limited to once every {rate_limit_seconds} seconds. Please wait before requesting another OTP.',
+        'rate_limited': True
+    }, status=status.HTTP_429_TOO_MANY_REQUESTS)
+
+
+def _whoami_cache_key(request):
+    """Return the whoami cache key for the session's logged-in user, or None without one."""
+    user_id = request.session.get(SESSION_KEY)
+    return User.whoami_cache_key(user_id) if user_id else None
+
+
+def _whoami_response(request, payload):
     """
-    Return current session/auth status for the frontend to restore state.
-    GET /api/auth/whoami/
+    Respond with the whoami payload and an ETag over it.
+
+    Polling clients that send the ETag back in If-None-Match get an empty 304.
     """
-    permission_classes = [AllowAny]
+    etag = quote_etag(hashlib.md5(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest())
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(payload)
+    response['ETag'] = etag
+    # Per-user data: browsers may keep it but must revalidate on every poll
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _parse_csv(value):
+    """Split a comma-separated query parameter into its non-empty, stripped parts."""
+    return [part.strip() for part in value.split(',') if part.strip()] if value else []
+
+
+class ThreadQueryParamFilter(BaseFilterBackend):
+    """
+    Filter threads by the ?ids=, ?tag= and ?category= query parameters.
+
+    - ids: comma-separated thread ids (used to hydrate search results)
+    - tag: comma-separated tag names; matches threads with ANY of the active tags
+    - category: a category id
+    Malformed ids or category values are ignored rather than rejected.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+
+        try:
+            thread_ids = [int(part) for part in _parse_csv(params.get('ids'))]
+        except ValueError:
+            thread_ids = []
+        if thread_ids:
+            queryset = queryset.filter(id__in=thread_ids)
+
+        tag_names = _parse_csv(params.get('tag'))
+        if tag_names:
+            # Unknown or inactive tags simply match nothing in the join.
+            queryset = queryset.filter(
+                threadtags__tag_id__name__in=tag_names,
+                threadtags__tag_id__is_active=True,
+            ).distinct()
+
+        category_param = params.get('category')
+        if category_param:
+            try:
+                queryset = queryset.filter(category_id=int(category_param))
+            except ValueError:
+                pass
+
+        return queryset
+
+
+def _thread_replies_queryset(thread):
+    """
+    Visible replies of a thread, oldest first, ready for ReplySerializer.
+
+    Author and thread are joined and narrowed to the rendered columns, and the
+    active like count is annotated so serializing costs no per-reply queries.
+    """
+    return (
+        Reply.objects.filter(thread_id=thread, is_deleted=False)
+        .select_related('user_id', 'thread_id')
+        .only(*REPLY_ONLY_FIELDS)
+        .annotate(active_like_count=Count('replylike', filter=Q(replylike__status=True)))
+        .order_by('create_time')
+    )
+
+
+class RankedThreadSearchFilter(SearchFilter):
+    """
+    Ranked ?search= for threads using PostgreSQL full-text search.
+
+    Matches the weighted title/body search vector (covered by the
+    thread_search_vector GIN index) or fuzzy title matches via pg_trgm, and
+    orders by rank unless ?ordering= is given. Other database backends fall
+    back to DRF's icontains search.
+    """
+    search_config = 'english'
+    min_similarity = 0.1
+
+    def filter_queryset(self, request, queryset, view):
+        search_terms = self.get_search_terms(request)
+        if not search_terms or connection.vendor != 'postgresql':
+            return super().filter_queryset(request, queryset, view)
+
+        query_text = ' '.join(search_terms)
+        vector = (
+            SearchVector('title', weight='A', config=self.search_config)
+            + SearchVector('body', weight='B', config=self.search_config)
+        )
+        search_query = SearchQuery(query_text, config=self.search_config)
+        queryset = queryset.annotate(
+            search=vector,
+            rank=SearchRank(vector, search_query),
+            similarity=TrigramSimilarity('title', query_text),
+        ).filter(Q(search=search_query) | Q(similarity__gt=self.min_similarity))
+
+        if not request.query_params.get(api_settings.ORDERING_PARAM):
+            queryset = queryset.order_by('-rank', '-similarity', '-create_time')
+        return queryset
 
-    def get(self, request):
-        user = getattr(request, 'user', None)
-        if user and user.is_authenticated:
-            is_admin_user = getattr(user, 'is_admin', False) or getattr(user, 'is_staff', False) or getattr(user, 'is_superuser', False)
-            # Admin users should always appear as non-anonymous for UI purposes
-            return Response({
-                'logged_in': True,
-                'user_id': user.id,
-                'username': user.username,
-                'is_anonymous': False if is_admin_user else getattr(user, 'is_anonymous', False),
-                'is_staff': getattr(user, 'is_staff', False),
-                'is_superuser': getattr(user, 'is_superuser', False),
-                'is_admin': getattr(user, 'is_admin', False),
-            })
-        return Response({'logged_in': False})
 
 class ThreadViewSet(viewsets.ModelViewSet):
     """
@@ -79,11 +253,12 @@ class ThreadViewSet(viewsets.ModelViewSet):
     Query parameters:
     - ordering: Sort by field (e.g., ?ordering=-create_time, ?ordering=title)
     - search: Search in title and body (e.g., ?search=django)
+    - ids, tag, category: see ThreadQueryParamFilter
     """
     queryset = Thread.objects.all().order_by('-create_time')
     serializer_class = ThreadSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [OrderingFilter, SearchFilter]
+    filter_backends = [ThreadQueryParamFilter, OrderingFilter, RankedThreadSearchFilter]
     ordering_fields = ['create_time', 'edit_time', 'title']
     ordering = ['-create_time']
     search_fields = ['title', 'body']
@@ -102,52 +277,16 @@ class ThreadViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Optionally include deleted when requested by admin users."""
-        include_deleted = self.request.query_params.get('include_deleted')
-        tag_param = self.request.query_params.get('tag')
-        category_param = self.request.query_params.get('category')
-        ids_param = self.request.query_params.get('ids')  # Handle ids parameter for search filtering
+        include_deleted = self.request.query_params.get('include_deleted', '').lower() == 'true'
         base_qs = super().get_queryset()
-        user = getattr(self.request, 'user', None)
-        is_admin_user = bool(user) and (getattr(user, 'is_staff', False) or getattr(user, 'is_superuser', False) or getattr(user, 'is_admin', False))
-        
-        # Handle ids filtering (for search results)
-        if ids_param:
-            try:
-                thread_ids = [int(id.strip()) for id in ids_param.split(',') if id.strip()]
-                if thread_ids:
-                    base_qs = base_qs.filter(id__in=thread_ids)
-            except (ValueError, TypeError):
-                pass  # Invalid ids, ignore filter
-        
-        # Handle tag filtering
-        if tag_param:
-            # support single or comma-separated tag names
-            tag_names = [t.strip() for t in tag_param.split(',') if t.strip()]
-            if tag_names:
-                # First check if all tags exist
-                from forum.models import Tag
-                existing_tags = Tag.objects.filter(name__in=tag_names, is_active=True).values_list('name', flat=True)
-                
-                # Only apply filter if at least one tag exists
-                if len(existing_tags) > 0:
-                    # Use OR logic: thread must contain ANY of the specified tags
-                    base_qs = base_qs.filter(threadtags__tag_id__name__in=existing_tags).distinct()
-                else:
-                    # If no tags exist, return empty queryset
-                    base_qs = base_qs.none()
-        
-        # Handle category filtering
-        if category_param:
-            try:
-                category_id = int(category_param)
-                base_qs = base_qs.filter(category_id=category_id)
-            except (ValueError, TypeError):
-                pass  # Invalid category ID, ignore filter
         
-        # Handle deleted threads
-        if include_deleted and include_deleted.lower() == 'true' and is_admin_user:
-            return base_qs
-        return base_qs.filter(is_deleted=False)
+        # Handle deleted threads; destroy/restore must reach soft-deleted rows too
+        if self.action not in ('destroy', 'restore'):
+            base_qs = base_qs.visible_to(self.request.user, include_deleted=include_deleted)
+        if self.action == 'list':
+            # The list serializer never renders body/edit_time; skip shipping them
+            base_qs = base_qs.select_related('user_id', 'category_id').only(*THREAD_LIST_ONLY_FIELDS)
+        return base_qs
     
     def perform_create(self, serializer):
         """Set the author when creating a new thread."""
@@ -164,35 +303,22 @@ class ThreadViewSet(viewsets.ModelViewSet):
             # Only authors can edit or delete their own threads
             if obj.user_id != self.request.user:
                 # Allow admins to manage any thread
-                user = self.request.user
-                is_admin_user = getattr(user, 'is_staff', False) or getattr(user, 'is_superuser', False) or getattr(user, 'is_admin', False)
+                is_admin_user = self.request.is_admin_user
                 if not is_admin_user:
                     raise PermissionDenied("You can only edit or delete your own threads")
         return obj
     
     def destroy(self, request, *args, **kwargs):
         """Soft delete thread"""
-        # Fetch regardless of is_deleted filter
-        try:
-            instance = Thread.objects.get(pk=kwargs.get('pk'))
-        except Thread.DoesNotExist:
-            return Response({'error': 'Thread not found'}, status=status.HTTP_404_NOT_FOUND)
-        # Permission: author or admin
-        user = request.user
-        is_admin_user = getattr(user, 'is_staff', False) or getattr(user, 'is_superuser', False) or getattr(user, 'is_admin', False)
-        if instance.user_id != user and not is_admin_user:
-            from rest_framework.exceptions import PermissionDenied
-            raise PermissionDenied("You can only edit or delete your own threads")
+        # get_object includes deleted threads for destroy and enforces author-or-admin
+        instance = self.get_object()
         instance.soft_delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
     
     @action(detail=True, methods=['post'], permission_classes=[IsCustomAdminUser])
     def restore(self, request, pk=None):
         """Restore a soft deleted thread (admin only)."""
-        try:
-            thread = Thread.objects.get(pk=pk)
-        except Thread.DoesNotExist:
-            return Response({'error': 'Thread not found'}, status=status.HTTP_404_NOT_FOUND)
+        thread = self.get_object()
         
         # Check if user is banned - don't restore threads from banned users
         if thread.user_id.is_banned:
@@ -214,8 +340,9 @@ class ThreadViewSet(viewsets.ModelViewSet):
     def replies(self, request, pk=None):
         """Get all replies for a specific thread."""
         thread = self.get_object()
-        replies = Reply.objects.filter(thread_id=thread, is_deleted=False).order_by('create_time')
-        serializer = ReplySerializer(replies, many=True, context={'request': request})
+        # Stream rows so long threads never sit in the queryset cache
+        replies = _thread_replies_queryset(thread)
+        serializer = ReplySerializer(replies.iterator(chunk_size=500), many=True, context={'request': request})
         return Response(serializer.data)
 
     @action(detail=True, methods=['post'])
@@ -225,30 +352,20 @@ class ThreadViewSet(viewsets.ModelViewSet):
         # Only for authenticated users; anonymous can be ignored or extended later
         if not request.user or not request.user.is_authenticated:
             return Response({'ignored': True}, status=status.HTTP_200_OK)
-        ThreadView.objects.update_or_create(
-            user_id=request.user,
-            thread_id=thread,
-            defaults={'viewed_at': timezone.now()}
-        )
+        # cache.add only succeeds for the first view in the debounce window
+        debounce_key = f"thread_view:{request.user.id}:{thread.id}"
+        if cache.add(debounce_key, 1, timeout=THREAD_VIEW_DEBOUNCE_TIMEOUT):
+            ThreadView.record(request.user, thread)
         return Response({'ok': True})
     
     @action(detail=True, methods=['post'])
     def like(self, request, pk=None):
         """Toggle like status for a thread."""
         thread = self.get_object()
-        like, created = ThreadLike.objects.get_or_create(
-            user_id=request.user, thread_id=thread
-        )
-        if not created:
-            like.status = not like.status
-            like.save()
-        else:
-            like.status = True
-            like.save()
-        
+        liked, like_count = ThreadLike.toggle(request.user, thread)
         return Response({
-            'liked': like.status,
-            'like_count': ThreadLike.objects.filter(thread_id=thread, status=True).count()
+            'liked': liked,
+            'like_count': like_count
         })
     
 
@@ -284,14 +401,18 @@ class ReplyViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Optionally include deleted when requested by admin users."""
-        include_deleted = self.request.query_params.get('include_deleted')
+        include_deleted = self.request.query_params.get('include_deleted', '').lower() == 'true'
         base_qs = super().get_queryset()
-        user = getattr(self.request, 'user', None)
-        is_admin_user = bool(user) and (getattr(user, 'is_staff', False) or getattr(user, 'is_superuser', False) or getattr(user, 'is_admin', False))
         
-        if include_deleted and include_deleted.lower() == 'true' and is_admin_user:
-            return base_qs
-        return base_qs.filter(is_deleted=False)
+        # destroy/restore must reach soft-deleted rows too
+        if self.action not in ('destroy', 'restore'):
+            base_qs = base_qs.visible_to(self.request.user, include_deleted=include_deleted)
+        if self.action == 'list':
+            base_qs = base_qs.select_related('user_id', 'thread_id').only(*REPLY_ONLY_FIELDS)
+        elif self.action != 'destroy':
+            # Detail responses render the author and the thread title
+            base_qs = base_qs.select_related('user_id', 'thread_id')
+        return base_qs
     
     def perform_create(self, serializer):
         """Set the author when creating a new reply."""
@@ -308,8 +429,7 @@ class ReplyViewSet(viewsets.ModelViewSet):
             # Only authors can edit or delete their own replies
             if obj.user_id != self.request.user:
                 # Allow admins to manage any reply
-                user = self.request.user
-                is_admin_user = getattr(user, 'is_staff', False) or getattr(user, 'is_superuser', False) or getattr(user, 'is_admin', False)
+                is_admin_user = self.request.is_admin_user
                 if not is_admin_user:
                 
                     raise PermissionDenied("You can only edit or delete your own replies")
@@ -317,25 +437,15 @@ class ReplyViewSet(viewsets.ModelViewSet):
     
     def destroy(self, request, *args, **kwargs):
         """Soft delete reply"""
-        try:
-            instance = Reply.objects.get(pk=kwargs.get('pk'))
-        except Reply.DoesNotExist:
-            return Response({'error': 'Reply not found'}, status=status.HTTP_404_NOT_FOUND)
-        user = request.user
-        is_admin_user = getattr(user, 'is_staff', False) or getattr(user, 'is_superuser', False) or getattr(user, 'is_admin', False)
-        if instance.user_id != user and not is_admin_user:
-            from rest_framework.exceptions import PermissionDenied
-            raise PermissionDenied("You can only edit or delete your own replies")
+        # get_object includes deleted replies for destroy and enforces author-or-admin
+        instance = self.get_object()
         instance.soft_delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
     
     @action(detail=True, methods=['post'], permission_classes=[IsCustomAdminUser])
     def restore(self, request, pk=None):
         """Restore a soft-deleted reply (admin only)."""
-        try:
-            instance = Reply.objects.get(pk=pk)
-        except Reply.DoesNotExist:
-            return Response({'error': 'Reply not found'}, status=status.HTTP_404_NOT_FOUND)
+        instance = self.get_object()
         instance.restore()
         return Response(status=status.HTTP_204_NO_CONTENT)
     
@@ -343,19 +453,10 @@ class ReplyViewSet(viewsets.ModelViewSet):
     def like(self, request, pk=None):
         """Toggle like status for a reply."""
         reply = self.get_object()
-        like, created = ReplyLike.objects.get_or_create(
-            user_id=request.user, reply_id=reply
-        )
-        if not created:
-            like.status = not like.status
-            like.save()
-        else:
-            like.status = True
-            like.save()
-        
+        liked, like_count = ReplyLike.toggle(request.user, reply)
         return Response({
-            'liked': like.status,
-            'like_count': ReplyLike.objects.filter(reply_id=reply, status=True).count()
+            'liked': liked,
+            'like_count': like_count
         })
 
 
@@ -401,12 +502,15 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
             if len(bio) > 300:
                 return Response({'error': 'Bio too long (max 300)'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Save
+        # Save only the columns that changed
+        update_fields = ['update_time']
         if username is not None:
             user.username = username
+            update_fields.append('username')
         if bio is not None:
             user.bio = bio
-        user.save()
+            update_fields.append('bio')
+        user.save(update_fields=update_fields)
         return Response({'success': True, 'username': user.username, 'bio': user.bio})
 
     @action(detail=True, methods=['get'])
@@ -421,13 +525,23 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
         thread_count = Thread.objects.filter(user_id=target_user, is_deleted=False).count()
         reply_count = Reply.objects.filter(user_id=target_user, is_deleted=False).count()
 
-        # Likes given by this user
-        given_thread_likes = ThreadLike.objects.filter(user_id=target_user, status=True).count()
-        given_reply_likes = ReplyLike.objects.filter(user_id=target_user, status=True).count()
-
-        # Likes received on user's content
-        received_thread_likes = ThreadLike.objects.filter(thread_id__user_id=target_user, status=True).count()
-        received_reply_likes = ReplyLike.objects.filter(reply_id__user_id=target_user, status=True).count()
+        # Likes given by and received by this user, one conditional aggregate per like table
+        thread_likes = ThreadLike.objects.filter(
+            Q(user_id=target_user) | Q(thread_id__user_id=target_user), status=True
+        ).aggregate(
+            given=Count('id', filter=Q(user_id=target_user)),
+            received=Count('id', filter=Q(thread_id__user_id=target_user)),
+        )
+        reply_likes = ReplyLike.objects.filter(
+            Q(user_id=target_user) | Q(reply_id__user_id=target_user), status=True
+        ).aggregate(
+            given=Count('id', filter=Q(user_id=target_user)),
+            received=Count('id', filter=Q(reply_id__user_id=target_user)),
+        )
+        given_thread_likes = thread_likes['given']
+        given_reply_likes = reply_likes['given']
+        received_thread_likes = thread_likes['received']
+        received_reply_likes = reply_likes['received']
 
         return Response({
             'user_id': target_user.id,
@@ -460,7 +574,6 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
 
         if request.method == 'DELETE':
             if request.user != target_user:
-                from rest_framework.exceptions import PermissionDenied
                 raise PermissionDenied('Cannot clear history of another user')
             ThreadView.objects.filter(user_id=target_user).delete()
             return Response({'success': True})
@@ -468,7 +581,12 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
         # GET with pagination params
         page = int(request.query_params.get('page', 1))
         limit = min(int(request.query_params.get('limit', 10)), 50)
-        qs = ThreadView.objects.filter(user_id=target_user).select_related('thread_id').order_by('-viewed_at')
+        qs = (
+            ThreadView.objects.filter(user_id=target_user)
+            .select_related('thread_id__user_id')
+            .only('id', 'viewed_at', *HISTORY_THREAD_ONLY_FIELDS)
+            .order_by('-viewed_at')
+        )
         total = qs.count()
         start = (page - 1) * limit
         end = start + limit
@@ -495,7 +613,12 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
 
         page = int(request.query_params.get('page', 1))
         limit = min(int(request.query_params.get('limit', 10)), 50)
-        qs = ThreadLike.objects.filter(user_id=target_user, status=True).select_related('thread_id').order_by('-create_time')
+        qs = (
+            ThreadLike.objects.filter(user_id=target_user, status=True)
+            .select_related('thread_id__user_id')
+            .only('id', 'create_time', *HISTORY_THREAD_ONLY_FIELDS)
+            .order_by('-create_time')
+        )
         total = qs.count()
         start = (page - 1) * limit
         end = start + limit
@@ -514,63 +637,72 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=True, methods=['post'], permission_classes=[IsCustomAdminUser])
     def ban(self, request, pk=None):
         """Ban a user (set is_banned=True) and soft delete their content."""
-        try:
-            user = User.objects.get(pk=pk)
-        except User.DoesNotExist:
-            return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
-        
-        # Don't allow banning admin users
-        if user.is_admin or user.is_staff or user.is_superuser:
-            return Response({'error': 'Cannot ban admin users'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        user.is_banned = True
-        user.save()
-        
-        # Soft delete all threads created by this user
-        Thread.objects.filter(user_id=user).update(is_deleted=True)
-        
-        # Soft delete all replies created by this user
-        Reply.objects.filter(user_id=user).update(is_deleted=True)
+        # Lock the user row so concurrent ban/unban calls apply all-or-nothing in order
+        with transaction.atomic():
+            try:
+                user = User.objects.select_for_update().get(pk=pk)
+            except User.DoesNotExist:
+                return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
+            
+            # Don't allow banning admin users
+            if user.is_admin or user.is_staff or user.is_superuser:
+                return Response({'error': 'Cannot ban admin users'}, status=status.HTTP_400_BAD_REQUEST)
+            
+            user.is_banned = True
+            user.save(update_fields=['is_banned', 'update_time'])
+            
+            # Soft delete all threads created by this user
+            threads_affected = Thread.objects.filter(user_id=user).update(is_deleted=True)
+            
+            # Soft delete all replies created by this user
+            replies_affected = Reply.objects.filter(user_id=user).update(is_deleted=True)
+            
+            # Disable all likes given by this user
+            ThreadLike.objects.filter(user_id=user).update(status=False)
+            ReplyLike.objects.filter(user_id=user).update(status=False)
+            ReplyLike.sync_counts_liked_by(user)
         
-        # Disable all likes given by this user
-        from forum.models import ThreadLike, ReplyLike
-        ThreadLike.objects.filter(user_id=user).update(status=False)
-        ReplyLike.objects.filter(user_id=user).update(status=False)
+        # The bulk updates skip Thread/Reply.save(), so retire cached search pages here
+        bump_search_cache_version()
         
         return Response({
             'success': True, 
             'user_id': user.id, 
             'is_banned': user.is_banned,
-            'message': f'User banned and {Thread.objects.filter(user_id=user).count()} threads and {Reply.objects.filter(user_id=user).count()} replies soft deleted, likes disabled'
+            'message': f'User banned and {threads_affected} threads and {replies_affected} replies soft deleted, likes disabled'
         })
 
     @action(detail=True, methods=['post'], permission_classes=[IsCustomAdminUser])
     def unban(self, request, pk=None):
         """Unban a user (set is_banned=False) and restore their content."""
-        try:
-            user = User.objects.get(pk=pk)
-        except User.DoesNotExist:
-            return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
-        
-        user.is_banned = False
-        user.save()
-        
-        # Restore all threads created by this user
-        Thread.objects.filter(user_id=user).update(is_deleted=False)
-        
-        # Restore all replies created by this user
-        Reply.objects.filter(user_id=user).update(is_deleted=False)
+        with transaction.atomic():
+            try:
+                user = User.objects.select_for_update().get(pk=pk)
+            except User.DoesNotExist:
+                return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
+            
+            user.is_banned = False
+            user.save(update_fields=['is_banned', 'update_time'])
+            
+            # Restore all threads created by this user
+            threads_affected = Thread.objects.filter(user_id=user).update(is_deleted=False)
+            
+            # Restore all replies created by this user
+            replies_affected = Reply.objects.filter(user_id=user).update(is_deleted=False)
+            
+            # Restore all likes given by this user
+            ThreadLike.objects.filter(user_id=user).update(status=True)
+            ReplyLike.objects.filter(user_id=user).update(status=True)
+            ReplyLike.sync_counts_liked_by(user)
         
-        # Restore all likes given by this user
-        from forum.models import ThreadLike, ReplyLike
-        ThreadLike.objects.filter(user_id=user).update(status=True)
-        ReplyLike.objects.filter(user_id=user).update(status=True)
+        # The bulk updates skip Thread/Reply.save(), so retire cached search pages here
+        bump_search_cache_version()
         
         return Response({
             'success': True, 
             'user_id': user.id, 
             'is_banned': user.is_banned,
-            'message': f'User unbanned and {Thread.objects.filter(user_id=user).count()} threads and {Reply.objects.filter(user_id=user).count()} replies restored, likes enabled'
+            'message': f'User unbanned and {threads_affected} threads and {replies_affected} replies restored, likes enabled'
         })
 
 
@@ -613,20 +745,30 @@ class TagViewSet(viewsets.ModelViewSet):
         """
         Return active tags for non-admin users, all tags for admin users.
         """
-        user = getattr(self.request, 'user', None)
-        is_admin_user = bool(user) and (getattr(user, 'is_staff', False) or getattr(user, 'is_superuser', False) or getattr(user, 'is_admin', False))
+        is_admin_user = self.request.is_admin_user
         
         if is_admin_user:
             return Tag.objects.all().order_by('name')
         else:
             return Tag.objects.filter(is_active=True).order_by('name')
     
+    def list(self, request, *args, **kwargs):
+        """Serve the plain tag list (no search or page params) from cache."""
+        if request.query_params:
+            return super().list(request, *args, **kwargs)
+        cache_key = Tag.list_cache_key(include_inactive=bool(request.is_admin_user))
+        data = cache.get(cache_key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set(cache_key, data, timeout=TAG_LIST_CACHE_TIMEOUT)
+        return Response(data)
+    
     def perform_destroy(self, instance):
         """
         Soft delete by setting is_active=False instead of actually deleting.
         """
         instance.is_active = False
-        instance.save()
+        instance.save(update_fields=['is_active'])
     
     @action(detail=True, methods=['post'], permission_classes=[IsCustomAdminUser])
     def enable(self, request, name=None):
@@ -637,7 +779,7 @@ class TagViewSet(viewsets.ModelViewSet):
             return Response({'error': 'Tag not found'}, status=status.HTTP_404_NOT_FOUND)
         
         tag.is_active = True
-        tag.save()
+        tag.save(update_fields=['is_active'])
         return Response({
             'success': True,
             'tag_name': tag.name,
@@ -654,7 +796,7 @@ class TagViewSet(viewsets.ModelViewSet):
             return Response({'error': 'Tag not found'}, status=status.HTTP_404_NOT_FOUND)
         
         tag.is_active = False
-        tag.save()
+        tag.save(update_fields=['is_active'])
         return Response({
             'success': True,
             'tag_name': tag.name,
@@ -706,59 +848,39 @@ class LoginAPIView(APIView):
         user = authenticate(request, username=email, password=password)
         if not user:
             # Check if user exists but is banned
-            try:
-                existing_user = User.objects.get(email=email)
-                if getattr(existing_user, 'is_banned', False):
-                    return Response({
-                        'error': 'Your account has been banned. Please contact the administrator.',
-                        'banned': True
-                    }, status=status.HTTP_403_FORBIDDEN)
-            except User.DoesNotExist:
-                try:
-                    existing_user = User.objects.get(username=email)
-                    if getattr(existing_user, 'is_banned', False):
-                        return Response({
-                            'error': 'Your account has been banned. Please contact the administrator.',
-                            'banned': True
-                        }, status=status.HTTP_403_FORBIDDEN)
-                except User.DoesNotExist:
-                    pass
+            existing_user = find_user_by_login(email)
+            if existing_user is not None and getattr(existing_user, 'is_banned', False):
+                return Response({
+                    'error': 'Your account has been banned. Please contact the administrator.',
+                    'banned': True
+                }, status=status.HTTP_403_FORBIDDEN)
             
-            fails = cache.get(fail_key, 0) + 1
-            cache.set(fail_key, fails, timeout=600)  # 10 minutes window
+            # Atomic increment so concurrent failures cannot overwrite each other's count.
+            # The 10 minute window starts at the first failure; incr keeps its expiry.
+            try:
+                fails = cache.incr(fail_key)
+            except ValueError:
+                fails = 1 if cache.add(fail_key, 1, timeout=600) else cache.incr(fail_key)
             if fails >= 5:
                 cache.set(lock_key, True, timeout=600)
             return Response({'error': 'Invalid email or password'}, status=status.HTTP_401_UNAUTHORIZED)
 
         # If password passes, send OTP to email and store in cache
-        import random
-        otp = f"{random.randint(100000, 999999)}"
+        otp = _generate_otp()
         otp_key = f"auth:otp:{user.id}"
         cache.set(otp_key, otp, timeout=300)  # 5 minutes
-        # Use backend email service (Mailjet with fallback). Send to plain email from request for reliability
-        logger = logging.getLogger(__name__)
-        recipient_email = email
-        try:
-            result = email_service.send_otp_with_retry(to_email=recipient_email, otp_code=otp, user_id=user.id)
-        except Exception as e:
-            logger.error(f"OTP send raised: {e}")
-            result = {'success': False, 'error': str(e)}
-
-        if not result.get('success'):
-            logger.error(f"Failed to send OTP email to user {user.id}: {result.get('error')}")
-            return Response({
-                'mfa_required': True,
-                'user_id': user.id,
-                'message': 'OTP sent to your email (delivery may be delayed)',
-                'email_status': 'pending'
-            })
+        # Correct password resets the failure window (the lock key was checked above)
+        cache.delete(fail_key)
+        # Send via the email service (Mailjet with fallback) on the email worker pool once
+        # the request commits, so the response does not wait on the provider.
+        # Send to plain email from request for reliability
+        enqueue_on_commit(send_otp_task, user.id, email, otp)
 
         return Response({
             'mfa_required': True,
             'user_id': user.id,
             'message': 'OTP sent to your email',
-            'email_status': 'sent',
-            'delivery_method': result.get('method', 'unknown')
+            'email_status': 'queued'
         })
 
 
@@ -805,10 +927,15 @@ class RegisterAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        if User.objects.filter(email=email).exists():
+        # One query for both uniqueness checks; at most two rows can clash, and an
+        # email clash is reported first
+        clashes = list(
+            User.objects.filter(Q(email=email) | Q(username=username)).values_list('email', flat=True)[:2]
+        )
+        if email in clashes:
             return Response({'error': 'Email already exists'}, status=status.HTTP_400_BAD_REQUEST)
         
-        if User.objects.filter(username=username).exists():
+        if clashes:
             return Response({'error': 'Username already exists'}, status=status.HTTP_400_BAD_REQUEST)
         
         # Validate username
@@ -825,11 +952,8 @@ class RegisterAPIView(APIView):
             return Response({'error': ' '.join(e.messages)}, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            user = User.objects.create_user(username=username, email=email, password=password)
-            # Set admin status if requested
-            if is_admin:
-                user.is_admin = True
-                user.save()
+            # Admin status is part of the INSERT rather than a follow-up UPDATE
+            User.objects.create_user(username=username, email=email, password=password, is_admin=bool(is_admin))
         except Exception as e:
             return Response({'error': 'Failed to create user'}, status=status.HTTP_400_BAD_REQUEST)
         return Response({'success': True, 'message': 'Registration successful'})
@@ -851,7 +975,10 @@ class VerifyOTPAPIView(APIView):
 
         otp_key = f"auth:otp:{user_id}"
         cached = cache.get(otp_key)
-        if not cached or cached != otp:
+        # Claim the OTP as soon as it matches. delete() reports whether this request
+        # removed the key, so two concurrent verifies cannot both use one OTP, and
+        # every later outcome (unknown user, banned, success) has already consumed it.
+        if not cached or cached != otp or not cache.delete(otp_key):
             return Response({'error': 'Invalid or expired OTP'}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
@@ -861,11 +988,8 @@ class VerifyOTPAPIView(APIView):
 
         # Check if user is banned
         if getattr(user, 'is_banned', False):
-            cache.delete(otp_key)  # Clear OTP even if user is banned
             return Response({'error': 'Account is banned. Please contact administrator.'}, status=status.HTTP_403_FORBIDDEN)
 
-        # OTP valid -> log the user in and clear OTP
-        cache.delete(otp_key)
         login(request, user)
         return Response({
             'success': True,
@@ -894,20 +1018,32 @@ class ResendOTPAPIView(APIView):
         if not user_id:
             return Response({'error': 'user_id is required'}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            user = User.objects.get(id=user_id)
-        except User.DoesNotExist:
-            return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
+        # Ban flag, email and rate limit in one cache round trip; the database
+        # is only consulted when the user's meta has expired
+        meta_key = User.meta_cache_key(user_id)
+        rate_limit_key = email_service.rate_limit_key(user_id)
+        cached = cache.get_many([meta_key, rate_limit_key])
+        if rate_limit_key in cached:
+            return _otp_rate_limited_response()
+
+        meta = cached.get(meta_key)
+        if meta is None:
+            try:
+                meta = User.load_meta(user_id)
+            except (TypeError, ValueError):
+                meta = None
+            if meta is None:
+                return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
 
         # Check if user is banned
-        if getattr(user, 'is_banned', False):
+        if meta['is_banned']:
             return Response({'error': 'Account is banned. Please contact administrator.'}, status=status.HTTP_403_FORBIDDEN)
 
         # Use provided email or get from user (decrypt if needed)
         recipient_email = email
         if not recipient_email:
             # Try to get email from user model
-            recipient_email = getattr(user, 'email', '')
+            recipient_email = meta['email'] or ''
             # If email is encrypted, try to decrypt it
             if recipient_email and '@' not in recipient_email:
                 try:
@@ -918,45 +1054,22 @@ class ResendOTPAPIView(APIView):
         if not recipient_email or '@' not in recipient_email:
             return Response({'error': 'Email address is required. Please provide email in request.'}, status=status.HTTP_400_BAD_REQUEST)
 
+        # Claim the send slot before generating the OTP so a rate-limited request
+        # leaves the current code in place
+        if not email_service.acquire_rate_limit(meta['id']):
+            return _otp_rate_limited_response()
+
         # Generate new OTP
-        import random
-        otp = f"{random.randint(100000, 999999)}"
+        otp = _generate_otp()
         otp_key = f"auth:otp:{user_id}"
         cache.set(otp_key, otp, timeout=300)  # 5 minutes
 
-        # Send OTP via email service (with rate limiting built-in)
-        logger = logging.getLogger(__name__)
-        try:
-            result = email_service.send_otp_with_retry(to_email=recipient_email, otp_code=otp, user_id=user.id)
-        except Exception as e:
-            logger.error(f"OTP resend raised: {e}")
-            result = {'success': False, 'error': str(e)}
-
-        if not result.get('success'):
-            error_msg = result.get('error', 'Failed to send OTP email')
-            logger.error(f"Failed to resend OTP email to user {user.id}: {error_msg}")
-            
-            # Check if it's a rate limit error
-            if 'rate limit' in error_msg.lower():
-                # Extract rate limit seconds from settings for error message
-                rate_limit_seconds = getattr(settings, 'EMAIL_RATE_LIMIT_SECONDS', 10)
-                return Response({
-                    'success': False,
-                    'error': f'OTP requests are limited to once every {rate_limit_seconds} seconds. Please wait before requesting another OTP.',
-                    'rate_limited': True
-                }, status=status.HTTP_429_TOO_MANY_REQUESTS)
-            
-            return Response({
-                'success': False,
-                'error': error_msg,
-                'message': 'Failed to resend OTP. Please try again later.'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-
+        # Delivered on the email worker pool after commit, like the login OTP
+        enqueue_on_commit(send_otp_task, meta['id'], recipient_email, otp, rate_limit=False)
         return Response({
             'success': True,
             'message': 'OTP code has been resent to your email',
-            'email_status': 'sent',
-            'delivery_method': result.get('method', 'unknown')
+            'email_status': 'queued'
         })
 
 
@@ -975,8 +1088,9 @@ class ThreadRepliesAPIView(APIView):
         except Thread.DoesNotExist:
             return Response({'error': 'Thread not found'}, status=status.HTTP_404_NOT_FOUND)
         
-        replies = Reply.objects.filter(thread_id=thread, is_deleted=False).order_by('create_time')
-        serializer = ReplySerializer(replies, many=True, context={'request': request})
+        # Stream rows so long threads never sit in the queryset cache
+        replies = _thread_replies_queryset(thread)
+        serializer = ReplySerializer(replies.iterator(chunk_size=500), many=True, context={'request': request})
         return Response(serializer.data)
 
 
@@ -995,19 +1109,11 @@ class ThreadLikeAPIView(APIView):
         except Thread.DoesNotExist:
             return Response({'error': 'Thread not found'}, status=status.HTTP_404_NOT_FOUND)
         
-        like, created = ThreadLike.objects.get_or_create(
-            user_id=request.user, thread_id=thread
-        )
-        if not created:
-            like.status = not like.status
-            like.save()
-        else:
-            like.status = True
-            like.save()
-        
+        # Single upsert; toggle() returns the fresh like count
+        liked, like_count = ThreadLike.toggle(request.user, thread)
         return Response({
-            'liked': like.status,
-            'like_count': ThreadLike.objects.filter(thread_id=thread, status=True).count()
+            'liked': liked,
+            'like_count': like_count
         })
 
 
@@ -1026,19 +1132,11 @@ class ReplyLikeAPIView(APIView):
         except Reply.DoesNotExist:
             return Response({'error': 'Reply not found'}, status=status.HTTP_404_NOT_FOUND)
         
-        like, created = ReplyLike.objects.get_or_create(
-            user_id=request.user, reply_id=reply
-        )
-        if not created:
-            like.status = not like.status
-            like.save()
-        else:
-            like.status = True
-            like.save()
-        
+        # Single upsert; toggle() returns the fresh like count
+        liked, like_count = ReplyLike.toggle(request.user, reply)
         return Response({
-            'liked': like.status,
-            'like_count': ReplyLike.objects.filter(reply_id=reply, status=True).count()
+            'liked': liked,
+            'like_count': like_count
         })
 
 
@@ -1053,6 +1151,9 @@ class SearchAPIView(APIView):
     - sort: Sort order - 'recent', 'popular', 'relevance' (default: 'recent')
     - page: Page number for pagination (default: 1)
     - limit: Number of results per page (default: 20, max: 100)
+    - threads_after / replies_after: keyset cursors for sort=recent, taken from
+      next_threads_cursor / next_replies_cursor; they replace page and stay
+      constant-time however deep the client pages
     """
     permission_classes = [AllowAny]
     
@@ -1079,6 +1180,26 @@ class SearchAPIView(APIView):
         if sort_order not in ['recent', 'popular', 'relevance']:
             return Response({'error': 'Invalid sort order. Use: recent, popular, or relevance'}, status=status.HTTP_400_BAD_REQUEST)
         
+        threads_after = request.query_params.get('threads_after')
+        replies_after = request.query_params.get('replies_after')
+        if (threads_after or replies_after) and sort_order != 'recent':
+            return Response({'error': 'Cursor pagination is only supported with sort=recent'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            threads_cursor = _decode_search_cursor(threads_after) if threads_after else None
+            replies_cursor = _decode_search_cursor(replies_after) if replies_after else None
+        except ValueError:
+            return Response({'error': 'Invalid pagination cursor'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Popular queries are answered from cache without touching the database
+        digest = hashlib.blake2b(
+            f"{query}|{search_type}|{sort_order}|{page}|{limit}|{threads_after}|{replies_after}".encode('utf-8'),
+            digest_size=16,
+        ).hexdigest()
+        page_key = f"search:v{search_cache_version()}:{digest}"
+        cached = cache.get(page_key)
+        if cached is not None:
+            return Response(cached)
+        
         results = {
             'query': query,
             'type': search_type,
@@ -1089,26 +1210,65 @@ class SearchAPIView(APIView):
             'replies': [],
             'total_threads': 0,
             'total_replies': 0,
-            'total_results': 0
+            'total_results': 0,
+            'has_more_threads': False,
+            'has_more_replies': False,
+            'next_threads_cursor': None,
+            'next_replies_cursor': None
         }
         
         # Search threads
         if search_type in ['threads', 'all']:
-            threads = self._search_threads(query, sort_order, page, limit)
+            threads = self._search_threads(query, sort_order, page, limit, threads_cursor)
             results['threads'] = threads['results']
             results['total_threads'] = threads['total']
+            results['has_more_threads'] = threads['has_more']
+            results['next_threads_cursor'] = threads['next_cursor']
         
         # Search replies
         if search_type in ['replies', 'all']:
-            replies = self._search_replies(query, sort_order, page, limit)
+            replies = self._search_replies(query, sort_order, page, limit, replies_cursor)
             results['replies'] = replies['results']
             results['total_replies'] = replies['total']
+            results['has_more_replies'] = replies['has_more']
+            results['next_replies_cursor'] = replies['next_cursor']
         
         results['total_results'] = results['total_threads'] + results['total_replies']
         
+        cache.set(page_key, results, SEARCH_PAGE_CACHE_TIMEOUT)
         return Response(results)
     
-    def _search_threads(self, query, sort_order, page, limit):
+    def _paginate(self, queryset, kind, query, page, limit, sort_order, cursor=None):
+        """
+        Fetch one page plus a lookahead row to learn whether more results follow.
+        
+        With a cursor the page is seeked by (create_time, id) instead of OFFSET.
+        A short first page pins the total without a COUNT; otherwise the COUNT
+        runs once per query and kind, then is served from cache while the user
+        pages. Returns (rows, total, has_more, next_cursor).
+        """
+        if cursor is not None:
+            created, pk = cursor
+            start = 0
+            page_queryset = queryset.filter(Q(create_time__lt=created) | Q(create_time=created, id__lt=pk))
+        else:
+            start = (page - 1) * limit
+            page_queryset = queryset
+        rows = list(page_queryset[start:start + limit + 1])
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if cursor is None and not has_more and (rows or page == 1):
+            total = start + len(rows)
+        else:
+            digest = hashlib.sha1(query.lower().encode('utf-8')).hexdigest()
+            # Versioned like the page keys so totals never outlive the pages they describe
+            total = cache.get_or_set(
+                f"search:v{search_cache_version()}:count:{kind}:{digest}", queryset.count, SEARCH_COUNT_CACHE_TIMEOUT
+            )
+        next_cursor = _encode_search_cursor(rows[-1]) if has_more and sort_order == 'recent' else None
+        return rows, total, has_more, next_cursor
+    
+    def _search_threads(self, query, sort_order, page, limit, cursor=None):
         """Search threads by title and body content."""
         # Base query for non-deleted threads
         threads = Thread.objects.filter(is_deleted=False)
@@ -1119,44 +1279,45 @@ class SearchAPIView(APIView):
         
         # Apply sorting
         if sort_order == 'recent':
-            threads = threads.order_by('-create_time')
+            threads = threads.order_by('-create_time', '-id')
         elif sort_order == 'popular':
             # Sort by like count (we'll add this later)
             threads = threads.annotate(
                 like_count=Count('threadlike', filter=Q(threadlike__status=True))
             ).order_by('-like_count', '-create_time')
         elif sort_order == 'relevance':
-            # Simple relevance: title matches first, then body matches
-            threads = threads.extra(
-                select={
-                    'relevance': """
-                        CASE 
-                            WHEN title LIKE %s THEN 3
-                            WHEN body LIKE %s THEN 1
-                            ELSE 0
-                        END
-                    """
-                },
-                select_params=[f'%{query}%', f'%{query}%']
-            ).order_by('-relevance', '-create_time')
-        
-        # Get total count
-        total = threads.count()
+            if connection.vendor == 'postgresql':
+                # pg_trgm similarity, title weighted over body
+                relevance = TrigramSimilarity('title', query) * 3 + TrigramSimilarity('body', query)
+            else:
+                # Simple relevance: title matches first, then body matches
+                relevance = Case(
+                    When(title__icontains=query, then=Value(3)),
+                    When(body__icontains=query, then=Value(1)),
+                    default=Value(0),
+                    output_field=IntegerField(),
+                )
+            threads = threads.annotate(relevance=relevance).order_by('-relevance', '-create_time')
+        
+        # Join author/category for the serializer and skip columns it never renders
+        threads = threads.select_related('user_id', 'category_id').only(*THREAD_LIST_ONLY_FIELDS)
         
         # Apply pagination
-        start = (page - 1) * limit
-        end = start + limit
-        threads = threads[start:end]
+        threads, total, has_more, next_cursor = self._paginate(
+            threads, 'threads', query, page, limit, sort_order, cursor
+        )
         
         # Serialize results
         serializer = ThreadListSerializer(threads, many=True)
         
         return {
             'results': serializer.data,
-            'total': total
+            'total': total,
+            'has_more': has_more,
+            'next_cursor': next_cursor
         }
     
-    def _search_replies(self, query, sort_order, page, limit):
+    def _search_replies(self, query, sort_order, page, limit, cursor=None):
         """Search replies by body content."""
         # Base query for non-deleted replies
         replies = Reply.objects.filter(is_deleted=False)
@@ -1166,38 +1327,35 @@ class SearchAPIView(APIView):
         
         # Apply sorting
         if sort_order == 'recent':
-            replies = replies.order_by('-create_time')
+            replies = replies.order_by('-create_time', '-id')
         elif sort_order == 'popular':
             # Sort by like count (using existing like_count field)
             replies = replies.order_by('-like_count', '-create_time')
         elif sort_order == 'relevance':
-            # Simple relevance: body matches
-            replies = replies.extra(
-                select={
-                    'relevance': """
-                        CASE 
-                            WHEN body LIKE %s THEN 2
-                            ELSE 0
-                        END
-                    """
-                },
-                select_params=[f'%{query}%']
-            ).order_by('-relevance', '-create_time')
+            if connection.vendor == 'postgresql':
+                replies = replies.annotate(
+                    relevance=TrigramSimilarity('body', query)
+                ).order_by('-relevance', '-create_time')
+            else:
+                # Every reply left here matches on body, so relevance ties; newest first
+                replies = replies.order_by('-create_time')
         
-        # Get total count
-        total = replies.count()
+        # Join author/thread for the serializer
+        replies = replies.select_related('user_id', 'thread_id').only(*REPLY_ONLY_FIELDS)
         
         # Apply pagination
-        start = (page - 1) * limit
-        end = start + limit
-        replies = replies[start:end]
+        replies, total, has_more, next_cursor = self._paginate(
+            replies, 'replies', query, page, limit, sort_order, cursor
+        )
         
         # Serialize results
         serializer = ReplySerializer(replies, many=True)
         
         return {
             'results': serializer.data,
-            'total': total
+            'total': total,
+            'has_more': has_more,
+            'next_cursor': next_cursor
         }
 
 
@@ -1216,11 +1374,11 @@ class ToggleAnonymousModeAPIView(APIView):
         
         user = request.user
         # Prevent admin users from using anonymous mode
-        is_admin_user = getattr(user, 'is_admin', False) or getattr(user, 'is_staff', False) or getattr(user, 'is_superuser', False)
+        is_admin_user = request.is_admin_user
         if is_admin_user:
             # Force admin users to non-anonymous mode
             user.is_anonymous = False
-            user.save()
+            user.save(update_fields=['is_anonymous', 'update_time'])
             return Response({
                 'success': True,
                 'is_anonymous': False,
@@ -1228,7 +1386,7 @@ class ToggleAnonymousModeAPIView(APIView):
             })
         
         user.is_anonymous = is_anonymous
-        user.save()
+        user.save(update_fields=['is_anonymous', 'update_time'])
         
         return Response({
             'success': True,
@@ -1237,7 +1395,6 @@ class ToggleAnonymousModeAPIView(APIView):
         })
 
 
-@method_decorator(ensure_csrf_cookie, name='get')
 @method_decorator(ensure_csrf_cookie, name='get')
 class WhoAmIAPIView(APIView):
     """
@@ -1247,20 +1404,35 @@ class WhoAmIAPIView(APIView):
     Returns current user info or indicates not logged in.
     """
     permission_classes = [AllowAny]
-    
+
+    def perform_authentication(self, request):
+        """Defer authentication so cache hits never load the user row."""
+        pass
+
     def get(self, request):
         """Get current user's authentication status."""
-        if request.user.is_authenticated:
-            return Response({
-                'logged_in': True,
-                'user_id': request.user.id,
-                'username': request.user.username,
-                'is_anonymous': getattr(request.user, 'is_anonymous', False),
-                'is_staff': request.user.is_staff,
-                'is_superuser': request.user.is_superuser,
-                'is_admin': getattr(request.user, 'is_admin', False),
-            })
-        else:
-            return Response({
-                'logged_in': False,
-            })
+        # A hit needs the session's user id and the auth hash it was built for, so a
+        # flushed session or a password change falls through to real authentication.
+        # Bans and profile edits go through User.save, which drops the entry.
+        cache_key = _whoami_cache_key(request)
+        if cache_key:
+            cached = cache.get(cache_key)
+            if cached is not None and cached['session_hash'] == request.session.get(HASH_SESSION_KEY):
+                return _whoami_response(request, cached['payload'])
+
+        if not request.user.is_authenticated:
+            return _whoami_response(request, _ANON_WHOAMI_PAYLOAD)
+
+        payload = {
+            'logged_in': True,
+            'user_id': request.user.id,
+            'username': request.user.username,
+            'is_anonymous': getattr(request.user, 'is_anonymous', False),
+            'is_staff': request.user.is_staff,
+            'is_superuser': request.user.is_superuser,
+            'is_admin': getattr(request.user, 'is_admin', False),
+        }
+        if cache_key == User.whoami_cache_key(request.user.pk):
+            cached = {'session_hash': request.user.get_session_auth_hash(), 'payload': payload}
+            cache.set(cache_key, cached, timeout=WHOAMI_CACHE_TIMEOUT)
+        return _whoami_response(request, payload)
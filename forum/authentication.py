@@ -2,11 +2,44 @@
 Custom authentication backends for the Jacaranda Talk forum application.
 """
 
+import hashlib
+
+from django.conf import settings
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Q
 
 User = get_user_model()
 
+# "no such email/username" results are cached briefly to shed credential-stuffing load
+MISSING_LOGIN_CACHE_TIMEOUT = 60  # seconds
+
+
+def _missing_login_cache_key(identifier):
+    """Cache key for an unknown login identifier; salted so raw emails never hit the cache."""
+    digest = hashlib.sha256((settings.SECRET_KEY + identifier).encode('utf-8')).hexdigest()
+    return f"auth:noexist:{digest}"
+
+
+def find_user_by_login(identifier):
+    """
+    Return the user whose email or username equals identifier, or None.
+
+    Both columns are matched in one query; an email match wins over a
+    username match belonging to a different account.
+    """
+    candidates = list(User.objects.filter(Q(email=identifier) | Q(username=identifier))[:2])
+    for user in candidates:
+        if user.email == identifier:
+            return user
+    return candidates[0] if candidates else None
+
+
+def forget_missing_login(*identifiers):
+    """Drop cached "does not exist" results, e.g. once an account takes that email/username."""
+    cache.delete_many([_missing_login_cache_key(i) for i in identifiers if i])
+
 
 class EmailBackend(ModelBackend):
     """
@@ -21,18 +54,19 @@ class EmailBackend(ModelBackend):
         if username is None or password is None:
             return
         
-        try:
-            # First try to find user by email
-            user = User.objects.get(email=username)
-        except User.DoesNotExist:
-            try:
-                # If not found by email, try by username
-                user = User.objects.get(username=username)
-            except User.DoesNotExist:
-                # Run the default password hasher once to reduce the timing
-                # difference between an existing and a non-existing user
-                User().set_password(password)
-                return
+        missing_key = _missing_login_cache_key(username)
+        if cache.get(missing_key):
+            # Known-unknown identifier: skip the DB but keep the hashing decoy
+            User().set_password(password)
+            return
+        
+        user = find_user_by_login(username)
+        if user is None:
+            # Run the default password hasher once to reduce the timing
+            # difference between an existing and a non-existing user
+            User().set_password(password)
+            cache.set(missing_key, True, timeout=MISSING_LOGIN_CACHE_TIMEOUT)
+            return
         
         if user.check_password(password) and self.user_can_authenticate(user):
             return user
@@ -6,46 +6,120 @@ with fallback to Django's file-based email backend for development.
 """
 
 import logging
+import os
 import time
 import base64
-from typing import Dict, Any
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
 from django.conf import settings
 from django.core.mail import send_mail
 from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 import requests
+from requests.adapters import HTTPAdapter
+from django.utils.functional import SimpleLazyObject, empty
 
 logger = logging.getLogger(__name__)
 
+# OTP email body, built once; {otp_code} is the only substitution made per send
+_OTP_EMAIL_HTML = """
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="utf-8">
+            <meta name="viewport" content="width=device-width, initial-scale=1.0">
+            <title>Your Jacaranda Talk OTP</title>
+            <style>
+                body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto; padding: 20px; }
+                .header { background-color: #007bff; color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }
+                .content { background-color: #f8f9fa; padding: 30px; border-radius: 0 0 8px 8px; }
+                .otp-code { background-color: #007bff; color: white; font-size: 24px; font-weight: bold; padding: 15px 30px; border-radius: 8px; text-align: center; margin: 20px 0; letter-spacing: 3px; }
+                .warning { background-color: #fff3cd; border: 1px solid #ffeaa7; color: #856404; padding: 15px; border-radius: 8px; margin: 20px 0; }
+                .footer { text-align: center; margin-top: 30px; color: #666; font-size: 14px; }
+            </style>
+        </head>
+        <body>
+            <div class="header">
+                <h1>🔐 Jacaranda Talk</h1>
+                <p>Your One-Time Password</p>
+            </div>
+            <div class="content">
+                <h2>Hello!</h2>
+                <p>You requested a one-time password to access your Jacaranda Talk account.</p>
+                <div class="otp-code">{otp_code}</div>
+                <div class="warning">
+                    <strong>⚠️ Important:</strong>
+                    <ul>
+                        <li>This code expires in 5 minutes</li>
+                        <li>Never share this code with anyone</li>
+                        <li>If you didn't request this code, please ignore this email</li>
+                    </ul>
+                </div>
+                <p>Enter this code in the login form to complete your authentication.</p>
+            </div>
+            <div class="footer"><p>This is an automated message from Jacaranda Talk</p></div>
+        </body>
+        </html>
+        """
+
+
+# Mailjet v3.1 accepts at most this many entries in one Messages array
+MAILJET_BATCH_SIZE = 50
+
+# AES-GCM ciphertexts carry this leading byte; anything else is a legacy Fernet token
+_AEAD_VERSION = b'\x01'
+# Fernet tokens are already urlsafe base64 and always begin with this (version 0x80)
+_FERNET_TOKEN_PREFIX = 'gAAAAA'
+_AEAD_NONCE_SIZE = 12
+
+
+@lru_cache(maxsize=1)
+def _get_or_create_key() -> bytes:
+    """Get encryption key from Django settings (via .env) or generate new one."""
+    try:
+        key_env = getattr(settings, 'EMAIL_ENCRYPTION_KEY', '')
+    except Exception:
+        key_env = ''
+    if key_env:
+        logger.info(f"[EmailEncryption] Using EMAIL_ENCRYPTION_KEY from settings (len={len(key_env)})")
+        return key_env.encode()
+    
+    # Generate new key (in production, store this securely)
+    key = Fernet.generate_key()
+    logger.warning(f"Generated new encryption key. Store this in EMAIL_ENCRYPTION_KEY: {key.decode()}")
+    return key
+
+
+@lru_cache(maxsize=1)
+def _get_cipher() -> Fernet:
+    """Process-wide Fernet cipher, kept to decrypt values written before AES-GCM."""
+    return Fernet(_get_or_create_key())
+
+
+@lru_cache(maxsize=1)
+def _get_aead() -> AESGCM:
+    """Process-wide AES-256-GCM cipher, keyed from EMAIL_ENCRYPTION_KEY via HKDF."""
+    key = HKDF(
+        algorithm=hashes.SHA256(), length=32, salt=None, info=b'jacaranda-email-aesgcm'
+    ).derive(_get_or_create_key())
+    return AESGCM(key)
+
 
 class EmailEncryption:
     """Handle email encryption and decryption."""
     
-    def __init__(self):
-        # Generate or retrieve encryption key
-        self.key = self._get_or_create_key()
-        self.cipher = Fernet(self.key)
-    
-    def _get_or_create_key(self) -> bytes:
-        """Get encryption key from Django settings (via .env) or generate new one."""
-        try:
-            key_env = getattr(settings, 'EMAIL_ENCRYPTION_KEY', '')
-        except Exception:
-            key_env = ''
-        if key_env:
-            logger.info(f"[EmailEncryption] Using EMAIL_ENCRYPTION_KEY from settings (len={len(key_env)})")
-            return key_env.encode()
-        
-        # Generate new key (in production, store this securely)
-        key = Fernet.generate_key()
-        logger.warning(f"Generated new encryption key. Store this in EMAIL_ENCRYPTION_KEY: {key.decode()}")
-        return key
-    
     def encrypt_email(self, email: str) -> str:
         """Encrypt email address."""
         try:
-            encrypted = self.cipher.encrypt(email.encode())
-            return base64.b64encode(encrypted).decode()
+            nonce = os.urandom(_AEAD_NONCE_SIZE)
+            encrypted = _get_aead().encrypt(nonce, email.encode(), None)
+            return base64.b64encode(_AEAD_VERSION + nonce + encrypted).decode()
         except Exception as e:
             logger.error(f"Failed to encrypt email: {e}")
             return email  # Return original if encryption fails
@@ -53,41 +127,110 @@ class EmailEncryption:
     def decrypt_email(self, encrypted_email: str) -> str:
         """Decrypt email address."""
         try:
+            if encrypted_email.startswith(_FERNET_TOKEN_PREFIX):
+                # A bare Fernet token; decrypt it without an extra base64 pass
+                return _get_cipher().decrypt(encrypted_email.encode('ascii')).decode()
             encrypted_bytes = base64.b64decode(encrypted_email.encode())
-            decrypted = self.cipher.decrypt(encrypted_bytes)
+            if encrypted_bytes[:1] == _AEAD_VERSION:
+                nonce = encrypted_bytes[1:1 + _AEAD_NONCE_SIZE]
+                decrypted = _get_aead().decrypt(nonce, encrypted_bytes[1 + _AEAD_NONCE_SIZE:], None)
+            else:
+                decrypted = _get_cipher().decrypt(encrypted_bytes)
             return decrypted.decode()
         except Exception as e:
             logger.error(f"Failed to decrypt email: {e}")
             return encrypted_email  # Return original if decryption fails
 
 
+@dataclass(slots=True, frozen=True)
+class EmailSendResult:
+    """Outcome of one send attempt (or one batch request)."""
+    success: bool
+    method: str
+    error: Optional[str] = None
+    status_code: Optional[int] = None
+    retry_count: int = 0
+    count: int = 1
+
+
+@dataclass(frozen=True)
+class MailjetConfig:
+    """Mailjet credentials and sender, resolved from settings."""
+    api_key: str
+    api_secret: str
+    from_email: str
+    from_name: str
+
+
+@lru_cache(maxsize=1)
+def _get_mailjet_config() -> MailjetConfig:
+    """Resolve the Mailjet settings once per process."""
+    from_email = getattr(settings, 'MAILJET_FROM_EMAIL', None)
+    if from_email is None:
+        from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', 'no-reply@jacaranda.local')
+    return MailjetConfig(
+        api_key=getattr(settings, 'MAILJET_API_KEY', ''),
+        api_secret=getattr(settings, 'MAILJET_API_SECRET', ''),
+        from_email=from_email,
+        from_name=getattr(settings, 'MAILJET_FROM_NAME', 'Jacaranda Talk'),
+    )
+
+
 class MailjetEmailService:
     """Mailjet email service (v3.1) with error handling and fallback."""
 
     def __init__(self):
-        self.api_key = getattr(settings, 'MAILJET_API_KEY', '')
-        self.api_secret = getattr(settings, 'MAILJET_API_SECRET', '')
-        self.from_email = getattr(settings, 'MAILJET_FROM_EMAIL', getattr(settings, 'DEFAULT_FROM_EMAIL', 'no-reply@jacaranda.local'))
-        self.from_name = getattr(settings, 'MAILJET_FROM_NAME', 'Jacaranda Talk')
+        config = _get_mailjet_config()
+        self.api_key = config.api_key
+        self.api_secret = config.api_secret
+        self.from_email = config.from_email
+        self.from_name = config.from_name
         self.enabled = bool(self.api_key and self.api_secret)
         self.base_url = 'https://api.mailjet.com/v3.1/send'
+        # One pooled session per process keeps the TLS connection to Mailjet warm
+        # across sends; a failed send falls back to SMTP instead of retrying
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0))
+        self.session.auth = (self.api_key, self.api_secret)
 
-    def send_otp_email(self, to_email: str, otp_code: str, user_id: int) -> Dict[str, Any]:
+    def send_otp_email(self, to_email: str, otp_code: str, user_id: int) -> EmailSendResult:
         """Send OTP email using Mailjet with fallback."""
-        result = {
-            'success': False,
-            'method': 'unknown',
-            'error': None,
-            'retry_count': 0
-        }
         if self.enabled:
             result = self._send_with_mailjet(to_email, otp_code, user_id)
-            if result['success']:
+            if result.success:
                 return result
         logger.info(f"Mailjet failed, using fallback for user {user_id}")
         return self._send_with_fallback(to_email, otp_code, user_id)
 
-    def _send_with_mailjet(self, to_email: str, otp_code: str, user_id: int) -> Dict[str, Any]:
+    def send_batch(self, messages: List[Dict[str, Any]]) -> List[EmailSendResult]:
+        """
+        Send Mailjet v3.1 messages, up to MAILJET_BATCH_SIZE per API request.
+        
+        Each message is a Mailjet message dict ('To', 'Subject', 'TextPart', ...);
+        'From' defaults to the configured sender. Returns one result per request.
+        Meant for bulk notifications; OTPs keep the latency-sensitive single path.
+        """
+        if not self.enabled:
+            return [EmailSendResult(False, 'mailjet', error='Mailjet is not configured', count=len(messages))]
+        sender = {'Email': self.from_email, 'Name': self.from_name}
+        results = []
+        for start in range(0, len(messages), MAILJET_BATCH_SIZE):
+            chunk = [{'From': sender, **message} for message in messages[start:start + MAILJET_BATCH_SIZE]]
+            try:
+                response = self.session.post(self.base_url, json={'Messages': chunk}, timeout=(3.05, 27))
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Mailjet batch request failed ({len(chunk)} messages): {str(e)}")
+                results.append(EmailSendResult(False, 'mailjet', error=f"Network error: {str(e)}", count=len(chunk)))
+                continue
+            if response.status_code in (200, 202):
+                results.append(EmailSendResult(True, 'mailjet', status_code=response.status_code, count=len(chunk)))
+            else:
+                error_msg = f"Mailjet API error: {response.status_code}"
+                logger.error(f"Mailjet batch failed ({len(chunk)} messages): {error_msg}")
+                results.append(EmailSendResult(False, 'mailjet', error=error_msg, status_code=response.status_code, count=len(chunk)))
+        return results
+
+    def _send_with_mailjet(self, to_email: str, otp_code: str, user_id: int) -> EmailSendResult:
         """Send email using Mailjet API."""
         try:
             subject = 'Your Jacaranda Talk OTP'
@@ -106,26 +249,22 @@ class MailjetEmailService:
                 ]
             }
 
-            response = requests.post(
-                self.base_url,
-                auth=(self.api_key, self.api_secret),
-                json=payload,
-                timeout=30
-            )
+            # Separate connect/read timeouts so an unreachable host fails fast
+            response = self.session.post(self.base_url, json=payload, timeout=(3.05, 27))
             if response.status_code in (200, 202):
                 logger.info(f"OTP email sent via Mailjet to {to_email} for user {user_id}")
-                return { 'success': True, 'method': 'mailjet', 'status_code': response.status_code }
+                return EmailSendResult(True, 'mailjet', status_code=response.status_code)
             error_msg = f"Mailjet API error: {response.status_code}"
             logger.error(f"Mailjet email failed for user {user_id}: {error_msg}")
-            return { 'success': False, 'method': 'mailjet', 'status_code': response.status_code, 'error': error_msg }
+            return EmailSendResult(False, 'mailjet', error=error_msg, status_code=response.status_code)
         except requests.exceptions.RequestException as e:
             logger.error(f"Mailjet request failed for user {user_id}: {str(e)}")
-            return { 'success': False, 'method': 'mailjet', 'error': f"Network error: {str(e)}", 'retry_count': 0 }
+            return EmailSendResult(False, 'mailjet', error=f"Network error: {str(e)}")
         except Exception as e:
             logger.error(f"Mailjet email failed for user {user_id}: {str(e)}")
-            return { 'success': False, 'method': 'mailjet', 'error': str(e), 'retry_count': 0 }
+            return EmailSendResult(False, 'mailjet', error=str(e))
 
-    def _send_with_fallback(self, to_email: str, otp_code: str, user_id: int) -> Dict[str, Any]:
+    def _send_with_fallback(self, to_email: str, otp_code: str, user_id: int) -> EmailSendResult:
         """Send email using Django's fallback email backend."""
         try:
             send_mail(
@@ -136,97 +275,65 @@ class MailjetEmailService:
                 fail_silently=False,
             )
             logger.info(f"OTP email sent via fallback to {to_email} for user {user_id}")
-            return {'success': True, 'method': 'fallback', 'error': None}
+            return EmailSendResult(True, 'fallback')
         except Exception as e:
             logger.error(f"Fallback email failed for user {user_id}: {str(e)}")
-            return {'success': False, 'method': 'fallback', 'error': str(e)}
+            return EmailSendResult(False, 'fallback', error=str(e))
 
     def _get_otp_email_template(self, otp_code: str) -> str:
         """Generate HTML email template for OTP."""
-        return f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>Your Jacaranda Talk OTP</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background-color: #007bff; color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }}
-                .content {{ background-color: #f8f9fa; padding: 30px; border-radius: 0 0 8px 8px; }}
-                .otp-code {{ background-color: #007bff; color: white; font-size: 24px; font-weight: bold; padding: 15px 30px; border-radius: 8px; text-align: center; margin: 20px 0; letter-spacing: 3px; }}
-                .warning {{ background-color: #fff3cd; border: 1px solid #ffeaa7; color: #856404; padding: 15px; border-radius: 8px; margin: 20px 0; }}
-                .footer {{ text-align: center; margin-top: 30px; color: #666; font-size: 14px; }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>🔐 Jacaranda Talk</h1>
-                <p>Your One-Time Password</p>
-            </div>
-            <div class="content">
-                <h2>Hello!</h2>
-                <p>You requested a one-time password to access your Jacaranda Talk account.</p>
-                <div class="otp-code">{otp_code}</div>
-                <div class="warning">
-                    <strong>⚠️ Important:</strong>
-                    <ul>
-                        <li>This code expires in 5 minutes</li>
-                        <li>Never share this code with anyone</li>
-                        <li>If you didn't request this code, please ignore this email</li>
-                    </ul>
-                </div>
-                <p>Enter this code in the login form to complete your authentication.</p>
-            </div>
-            <div class="footer"><p>This is an automated message from Jacaranda Talk</p></div>
-        </body>
-        </html>
-        """
+        return _OTP_EMAIL_HTML.replace('{otp_code}', otp_code)
 
 
 class EmailServiceManager:
-    """Main email service manager with caching and retry logic."""
+    """Main email service manager with caching and rate limiting."""
     
     def __init__(self):
         self.mailjet_service = MailjetEmailService()
         self.encryption = EmailEncryption()
-        self.max_retries = 3
-        self.retry_delay = 1  # seconds
+        # Rate limiting - use EMAIL_RATE_LIMIT_SECONDS from settings, default to 10 seconds
+        self.rate_limit_seconds = getattr(settings, 'EMAIL_RATE_LIMIT_SECONDS', 10)
     
-    def send_otp_with_retry(self, to_email: str, otp_code: str, user_id: int) -> Dict[str, Any]:
+    def acquire_rate_limit(self, user_id: int) -> bool:
         """
-        Send OTP email with retry logic and caching.
+        Claim the user's OTP send slot; False if one was sent too recently.
+        
+        cache.add only succeeds when the key is absent, so concurrent requests
+        cannot both pass the check (a token bucket of capacity 1).
         """
-        # Rate limiting - use EMAIL_RATE_LIMIT_SECONDS from settings, default to 10 seconds
-        rate_limit_seconds = getattr(settings, 'EMAIL_RATE_LIMIT_SECONDS', 10)
-        rate_limit_key = f"email:rate_limit:{user_id}"
-        if cache.get(rate_limit_key):
-            return {
-                'success': False,
-                'error': f'OTP requests are limited to once every {rate_limit_seconds} seconds. Please wait before requesting another OTP.',
-                'method': 'rate_limit'
-            }
-        cache.set(rate_limit_key, True, timeout=rate_limit_seconds)
+        return cache.add(self.rate_limit_key(user_id), True, timeout=self.rate_limit_seconds)
+    
+    def send_otp(self, to_email: str, otp_code: str, user_id: int, rate_limit: bool = True) -> EmailSendResult:
+        """
+        Make one OTP send attempt (Mailjet, then the SMTP fallback); never sleeps.
         
-        # Try sending with retries
-        for attempt in range(self.max_retries):
-            result = self.mailjet_service.send_otp_email(to_email, otp_code, user_id)
-            
-            if result['success']:
-                self._log_email_send(user_id, to_email, result['method'], success=True)
-                return result
-            
-            if attempt < self.max_retries - 1:
-                time.sleep(self.retry_delay * (attempt + 1))
+        Pass rate_limit=False when the caller already holds the send slot from
+        acquire_rate_limit().
+        """
+        if rate_limit and not self.acquire_rate_limit(user_id):
+            return EmailSendResult(
+                False, 'rate_limit',
+                error=f'OTP requests are limited to once every {self.rate_limit_seconds} seconds. Please wait before requesting another OTP.',
+            )
         
-        self._log_email_send(user_id, to_email, result.get('method', 'unknown'), success=False)
+        result = self.mailjet_service.send_otp_email(to_email, otp_code, user_id)
+        self._log_email_send(user_id, to_email, result.method, success=result.success)
         return result
     
+    @staticmethod
+    def rate_limit_key(user_id) -> str:
+        """Cache key holding the per-user OTP send rate limit."""
+        return f"email:rate_limit:{user_id}"
+    
     def _log_email_send(self, user_id: int, email: str, method: str, success: bool):
         """Log email sending attempts for monitoring."""
+        level = logging.INFO if success else logging.ERROR
+        if not logger.isEnabledFor(level):
+            return
+        at = email.find('@')
         log_data = {
             'user_id': user_id,
-            'email': email[:3] + '***@' + email.split('@')[1] if '@' in email else '***',
+            'email': f"{email[:3]}***{email[at:]}" if at >= 0 else '***',
             'method': method,
             'success': success,
             'timestamp': time.time()
@@ -246,5 +353,34 @@ class EmailServiceManager:
         return self.encryption.decrypt_email(encrypted_email)
 
 
-# Global email service instance
-email_service = EmailServiceManager()
+@lru_cache(maxsize=1)
+def get_email_service() -> EmailServiceManager:
+    """Return the process-wide email service, building it on first use."""
+    return EmailServiceManager()
+
+
+# Global email service instance; constructed lazily so importing this module
+# (e.g. via forum.models in management commands) opens no HTTP session
+email_service = SimpleLazyObject(get_email_service)
+
+
+# settings read once per process above; override_settings must drop those copies
+_SERVICE_SETTINGS = frozenset({
+    'MAILJET_API_KEY', 'MAILJET_API_SECRET', 'MAILJET_FROM_EMAIL', 'MAILJET_FROM_NAME',
+    'DEFAULT_FROM_EMAIL', 'EMAIL_RATE_LIMIT_SECONDS',
+})
+
+
+@receiver(setting_changed)
+def _reset_cached_settings(*, setting, **kwargs):
+    """Forget memoized config, ciphers and the service when a setting they read changes."""
+    if setting == 'EMAIL_ENCRYPTION_KEY':
+        _get_or_create_key.cache_clear()
+        _get_cipher.cache_clear()
+        _get_aead.cache_clear()
+    elif setting in _SERVICE_SETTINGS:
+        _get_mailjet_config.cache_clear()
+    else:
+        return
+    get_email_service.cache_clear()
+    email_service._wrapped = empty
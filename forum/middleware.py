@@ -0,0 +1,23 @@
+"""
+Request middleware for the Jacaranda Talk forum application.
+"""
+
+from django.utils.functional import SimpleLazyObject
+
+from .models import user_is_admin
+
+
+class AdminFlagMiddleware:
+    """
+    Attach ``request.is_admin_user`` so views and permissions check it once.
+
+    The flag is evaluated lazily on first access, after DRF has authenticated
+    the request and written the resolved user back onto the Django request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.is_admin_user = SimpleLazyObject(lambda: user_is_admin(request.user))
+        return self.get_response(request)
@@ -0,0 +1,47 @@
+"""
+Trigram GIN indexes for the ?search= endpoints.
+
+DRF's SearchFilter turns ?search=foo into icontains lookups, which Django renders
+on PostgreSQL as UPPER(col::text) LIKE UPPER('%foo%'). pg_trgm GIN indexes on
+that same expression let the planner use an index scan instead of a sequential
+scan. Other database backends (SQLite in development) are left untouched.
+"""
+
+from django.db import migrations
+
+
+TRIGRAM_INDEXES = [
+    ('thread_title_trgm', 'thread', 'title'),
+    ('thread_body_trgm', 'thread', 'body'),
+    ('reply_body_trgm', 'reply', 'body'),
+    ('user_username_trgm', 'user', 'username'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for index_name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {index_name} ON "{table}" '
+            f'USING gin ((UPPER("{column}"::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for index_name, _table, _column in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0009_remove_user_nickname_alter_user_username'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
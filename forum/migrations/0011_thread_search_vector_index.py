@@ -0,0 +1,42 @@
+"""
+GIN index for ranked full-text thread search.
+
+The index expression mirrors the weighted SearchVector built by
+api.views.RankedThreadSearchFilter (title weight A, body weight B, 'english'
+config), so PostgreSQL can answer the @@ match from the index without storing a
+separate tsvector column. Other database backends are left untouched.
+"""
+
+from django.db import migrations
+
+
+THREAD_SEARCH_VECTOR_SQL = (
+    "(setweight(to_tsvector('english'::regconfig, COALESCE(\"title\", '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, COALESCE(\"body\", '')), 'B'))"
+)
+
+
+def create_search_vector_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS thread_search_vector ON "thread" '
+        f'USING gin ({THREAD_SEARCH_VECTOR_SQL})'
+    )
+
+
+def drop_search_vector_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS thread_search_vector')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0010_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_vector_index, drop_search_vector_index),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.6 on 2026-10-15 22:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0011_thread_search_vector_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reply',
+            index=models.Index(fields=['is_deleted', '-create_time'], name='reply_deleted_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='replylike',
+            index=models.Index(fields=['reply_id', 'status'], name='reply_like_reply_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='replylike',
+            index=models.Index(fields=['user_id', 'status'], name='reply_like_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='thread',
+            index=models.Index(fields=['is_deleted', '-create_time'], name='thread_deleted_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='threadlike',
+            index=models.Index(fields=['thread_id', 'status'], name='thread_like_thread_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='threadlike',
+            index=models.Index(fields=['user_id', 'status'], name='thread_like_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='threadview',
+            index=models.Index(fields=['user_id', '-viewed_at'], name='thread_view_user_viewed_idx'),
+        ),
+    ]
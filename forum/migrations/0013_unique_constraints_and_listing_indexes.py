@@ -0,0 +1,45 @@
+# Generated by Django 5.2.6 on 2026-10-15 23:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0012_composite_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='replylike',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='threadlike',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='threadview',
+            unique_together=set(),
+        ),
+        migrations.AddIndex(
+            model_name='reply',
+            index=models.Index(fields=['thread_id', 'is_deleted', 'create_time'], name='reply_thread_deleted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='thread',
+            index=models.Index(fields=['category_id', 'is_deleted', '-create_time'], name='thread_cat_deleted_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='replylike',
+            constraint=models.UniqueConstraint(fields=('reply_id', 'user_id'), name='reply_like_reply_user_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='threadlike',
+            constraint=models.UniqueConstraint(fields=('thread_id', 'user_id'), name='thread_like_thread_user_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='threadview',
+            constraint=models.UniqueConstraint(fields=('user_id', 'thread_id'), name='thread_view_user_thread_uniq'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-16 00:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0013_unique_constraints_and_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='email',
+            field=models.EmailField(help_text='Email address (stored in plain text)', max_length=254, unique=True),
+        ),
+    ]
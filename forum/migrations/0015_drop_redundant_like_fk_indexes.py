@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-16 00:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0014_bounded_user_email'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='replylike',
+            name='reply_id',
+            field=models.ForeignKey(db_column='reply_id', db_index=False, on_delete=django.db.models.deletion.CASCADE, to='forum.reply'),
+        ),
+        migrations.AlterField(
+            model_name='replylike',
+            name='user_id',
+            field=models.ForeignKey(db_column='user_id', db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='threadlike',
+            name='thread_id',
+            field=models.ForeignKey(db_column='thread_id', db_index=False, on_delete=django.db.models.deletion.CASCADE, to='forum.thread'),
+        ),
+        migrations.AlterField(
+            model_name='threadlike',
+            name='user_id',
+            field=models.ForeignKey(db_column='user_id', db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,31 @@
+"""
+Backfill Reply.like_count from the active reply_like rows.
+
+like_count is kept in step by ReplyLike.toggle from here on; replies liked before
+that started would otherwise keep a count of 0 and sort wrongly by popularity.
+"""
+
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_reply_like_counts(apps, schema_editor):
+    Reply = apps.get_model('forum', 'Reply')
+    ReplyLike = apps.get_model('forum', 'ReplyLike')
+    active_likes = (
+        ReplyLike.objects.filter(reply_id=OuterRef('pk'), status=True)
+        .order_by().values('reply_id').annotate(n=Count('id')).values('n')
+    )
+    Reply.objects.update(like_count=Coalesce(Subquery(active_likes), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0015_drop_redundant_like_fk_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_reply_like_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.6 on 2026-10-16 00:47
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forum', '0016_backfill_reply_like_count'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='thread',
+            name='body',
+            field=models.TextField(max_length=2000, validators=[django.core.validators.MaxLengthValidator(2000)]),
+        ),
+    ]
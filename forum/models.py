@@ -4,10 +4,41 @@ Database models for the Jacaranda Talk forum application.
 This module defines all database models based on the previous ERD design.
 """
 
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import AbstractUser
+from django.core.cache import cache
+from django.core.validators import MaxLengthValidator
 from django.urls import reverse
-from .email_service import email_service
+from django.utils import timezone
+
+
+USER_META_CACHE_TIMEOUT = 300  # seconds
+# fields whose change must invalidate the meta, whoami and missing-login caches
+USER_CACHED_FIELDS = frozenset({
+    'email', 'username', 'is_banned', 'password',
+    'is_anonymous', 'is_admin', 'is_staff', 'is_superuser',
+})
+
+# cached search pages are namespaced by this version; thread/reply writes bump it
+SEARCH_CACHE_VERSION_KEY = 'search:version'
+
+
+def search_cache_version():
+    """Current namespace for cached search result pages."""
+    # Seeded from the clock so a lost version key never revives stale pages
+    return cache.get_or_set(
+        SEARCH_CACHE_VERSION_KEY, lambda: int(timezone.now().timestamp() * 1000), timeout=None
+    )
+
+
+def bump_search_cache_version():
+    """Retire every cached search page after a thread or reply write."""
+    try:
+        cache.incr(SEARCH_CACHE_VERSION_KEY)
+    except ValueError:
+        search_cache_version()
 
 
 class User(AbstractUser):
@@ -19,7 +50,7 @@ class User(AbstractUser):
     Users can switch between normal and anonymous modes.
     """
     username = models.CharField(max_length=50, unique=True, null=False, help_text="User's display name/nickname")
-    email = models.TextField(unique=True, null=False, help_text="Encrypted email address")
+    email = models.EmailField(max_length=254, unique=True, null=False, help_text="Email address (stored in plain text)")
     is_anonymous = models.BooleanField(default=False, help_text="User's current posting mode (normal/anonymous)")
     is_admin = models.BooleanField(default=False, help_text="Designates whether this user is an admin")
     is_banned = models.BooleanField(default=False, help_text="Designates whether this user is banned (soft deleted)")
@@ -33,17 +64,50 @@ class User(AbstractUser):
     def __str__(self):
         return self.username
     
-    def get_email(self):
-        """Return plain email address (no encryption)."""
-        return self.email
-    
-    def set_email(self, email):
-        """Set plain email address (no encryption)."""
-        self.email = email
-    
     def save(self, *args, **kwargs):
-        """Standard save without email encryption."""
         super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not USER_CACHED_FIELDS.intersection(update_fields):
+            # e.g. the last_login write on every login; nothing cached has changed
+            return
+        # A new or renamed account must not stay hidden behind a cached failed lookup
+        from .authentication import forget_missing_login
+        forget_missing_login(self.email, self.username)
+        cache.delete_many([User.meta_cache_key(self.pk), User.whoami_cache_key(self.pk)])
+    
+    def delete(self, *args, **kwargs):
+        # The cascade removes this user's reply likes without going through
+        # ReplyLike, so recount the replies they had liked afterwards
+        with transaction.atomic():
+            liked_reply_ids = list(
+                ReplyLike.objects.filter(user_id=self, status=True).values_list('reply_id', flat=True)
+            )
+            result = super().delete(*args, **kwargs)
+            if liked_reply_ids:
+                Reply.sync_like_counts(liked_reply_ids)
+        return result
+    
+    @staticmethod
+    def meta_cache_key(user_id):
+        """Cache key for the (is_banned, email) pair read by the OTP endpoints."""
+        return f"user:meta:{user_id}"
+    
+    @staticmethod
+    def whoami_cache_key(user_id):
+        """Cache key for the payload served by the whoami endpoint."""
+        return f"user:whoami:{user_id}"
+    
+    @classmethod
+    def load_meta(cls, user_id):
+        """
+        Read a user's id, ban flag and email from the database and cache them.
+        
+        Returns None (uncached) when the user does not exist.
+        """
+        meta = cls.objects.filter(id=user_id).values('id', 'is_banned', 'email').first()
+        if meta is not None:
+            cache.set(cls.meta_cache_key(user_id), meta, timeout=USER_META_CACHE_TIMEOUT)
+        return meta
 
 
 class Category(models.Model):
@@ -87,6 +151,43 @@ class Tag(models.Model):
     
     def get_absolute_url(self):
         return reverse('forum:tag_detail', kwargs={'tag_name': self.name})
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        Tag.invalidate_list_cache()
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        Tag.invalidate_list_cache()
+        return result
+    
+    @staticmethod
+    def list_cache_key(include_inactive):
+        """Cache key for the serialized tag list (all tags or active only)."""
+        return f"tags:list:{'all' if include_inactive else 'active'}"
+    
+    @staticmethod
+    def invalidate_list_cache():
+        """Drop both cached tag lists after any tag write."""
+        cache.delete_many([Tag.list_cache_key(True), Tag.list_cache_key(False)])
+
+
+def user_is_admin(user):
+    """Return True if the user holds any of the admin flags."""
+    return bool(
+        user and user.is_authenticated and
+        (user.is_staff or user.is_superuser or getattr(user, 'is_admin', False))
+    )
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    """QuerySet for soft-deletable content (threads and replies)."""
+    
+    def visible_to(self, user, include_deleted=False):
+        """Hide soft-deleted rows unless an admin explicitly asks to include them."""
+        if include_deleted and user_is_admin(user):
+            return self
+        return self.filter(is_deleted=False)
 
 
 class Thread(models.Model):
@@ -100,41 +201,65 @@ class Thread(models.Model):
     user_id = models.ForeignKey(User, on_delete=models.CASCADE, db_column='user_id')
     category_id = models.ForeignKey(Category, on_delete=models.CASCADE, db_column='category_id')
     title = models.CharField(max_length=120, null=False)
-    body = models.TextField(max_length=2000, null=False)
+    # TextField max_length only sizes form widgets; the validator makes full_clean enforce it
+    body = models.TextField(max_length=2000, null=False, validators=[MaxLengthValidator(2000)])
     is_anonymous = models.BooleanField(default=False, help_text='Whether this thread was posted anonymously')
     is_deleted = models.BooleanField(default=False, help_text='Soft delete flag')
     create_time = models.DateTimeField(auto_now_add=True)
     edit_time = models.DateTimeField(auto_now=True)
 
+    objects = SoftDeleteQuerySet.as_manager()
+
     class Meta:
         db_table = 'thread'
         ordering = ['-create_time']
+        indexes = [
+            models.Index(fields=['is_deleted', '-create_time'], name='thread_deleted_created_idx'),
+            models.Index(fields=['category_id', 'is_deleted', '-create_time'], name='thread_cat_deleted_created_idx'),
+        ]
     
     def __str__(self):
         return self.title
     
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        bump_search_cache_version()
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        bump_search_cache_version()
+        return result
+    
     def get_absolute_url(self):
         return reverse('forum:thread_detail', kwargs={'thread_id': self.id})
     
     def get_author_display_name(self):
         """Get display name for author (anonymous or username)."""
         if self.is_anonymous:
-            return f"Anonymous#{self.user_id.id}"
+            # The raw FK value is on the row already; no need to load the user
+            return f"Anonymous#{self.user_id_id}"
         return self.user_id.username
     
     def soft_delete(self):
         """Soft delete thread"""
-        self.is_deleted = True
-        self.save()
-        # Cascade delete related replies
-        Reply.objects.filter(thread_id=self).update(is_deleted=True)
+        self._set_deleted(True)
     
     def restore(self):
         """Restore soft deleted thread"""
-        self.is_deleted = False
-        self.save()
-        # Restore related replies
-        Reply.objects.filter(thread_id=self).update(is_deleted=False)
+        self._set_deleted(False)
+    
+    def _set_deleted(self, is_deleted):
+        """
+        Flag the thread and cascade the flag to its replies.
+        
+        Two single-column UPDATEs in one transaction; edit_time is left alone
+        since deleting is not an edit.
+        """
+        with transaction.atomic():
+            Thread.objects.filter(pk=self.pk).update(is_deleted=is_deleted)
+            Reply.objects.filter(thread_id=self).update(is_deleted=is_deleted)
+        self.is_deleted = is_deleted
+        bump_search_cache_version()
 
 
 class ThreadTags(models.Model):
@@ -170,29 +295,97 @@ class Reply(models.Model):
     create_time = models.DateTimeField(auto_now_add=True)
     edit_time = models.DateTimeField(auto_now=True)
 
+    objects = SoftDeleteQuerySet.as_manager()
+
     class Meta:
         db_table = 'reply'
         ordering = ['create_time']
         verbose_name_plural = "Replies"
+        indexes = [
+            models.Index(fields=['is_deleted', '-create_time'], name='reply_deleted_created_idx'),
+            models.Index(fields=['thread_id', 'is_deleted', 'create_time'], name='reply_thread_deleted_idx'),
+        ]
     
     def __str__(self):
         return f"Reply to '{self.thread_id.title}' by {self.get_author_display_name()}"
     
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        bump_search_cache_version()
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        bump_search_cache_version()
+        return result
+    
     def get_author_display_name(self):
         """Get display name for author (anonymous or username)."""
         if self.is_anonymous:
-            return f"Anonymous#{self.user_id.id}"
+            # The raw FK value is on the row already; no need to load the user
+            return f"Anonymous#{self.user_id_id}"
         return self.user_id.username
     
     def soft_delete(self):
         """Soft delete reply"""
-        self.is_deleted = True
-        self.save()
+        self._set_deleted(True)
     
     def restore(self):
         """Restore soft deleted reply"""
-        self.is_deleted = False
-        self.save()
+        self._set_deleted(False)
+    
+    def _set_deleted(self, is_deleted):
+        """Flag the reply with a single-column UPDATE (edit_time is left alone)."""
+        Reply.objects.filter(pk=self.pk).update(is_deleted=is_deleted)
+        self.is_deleted = is_deleted
+        bump_search_cache_version()
+
+    @classmethod
+    def increment_likes(cls, pk):
+        """Bump the stored like counter in the database, without reading the row."""
+        cls.objects.filter(pk=pk).update(like_count=F('like_count') + 1)
+
+    @classmethod
+    def decrement_likes(cls, pk):
+        """Lower the stored like counter in the database, without reading the row."""
+        cls.objects.filter(pk=pk).update(like_count=F('like_count') - 1)
+
+    @classmethod
+    def sync_like_counts(cls, reply_ids):
+        """Recount like_count for the given replies after bulk like status changes."""
+        active_likes = (
+            ReplyLike.objects.filter(reply_id=OuterRef('pk'), status=True)
+            .order_by().values('reply_id').annotate(n=Count('id')).values('n')
+        )
+        cls.objects.filter(pk__in=reply_ids).update(
+            like_count=Coalesce(Subquery(active_likes), 0)
+        )
+
+
+def _toggle_like(model, target_field, target, user):
+    """
+    Flip a user's like on a thread or reply with a single upsert.
+
+    A missing row is inserted as liked; an existing row has its status negated.
+    The like count is read back with an indexed COUNT on (target, status), so it
+    always matches what the list/detail serializers report. Returns
+    (status, like_count).
+    """
+    table = connection.ops.quote_name(model._meta.db_table)
+    target_column = connection.ops.quote_name(model._meta.get_field(target_field).column)
+    user_column = connection.ops.quote_name(model._meta.get_field('user_id').column)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} ({target_column}, {user_column}, status, create_time) '
+            f'VALUES (%s, %s, %s, %s) '
+            f'ON CONFLICT ({target_column}, {user_column}) '
+            f'DO UPDATE SET status = NOT {table}.status '
+            f'RETURNING status',
+            [target.pk, user.pk, True, connection.ops.adapt_datetimefield_value(timezone.now())],
+        )
+        liked = bool(cursor.fetchone()[0])
+
+    like_count = model.objects.filter(**{target_field: target, 'status': True}).count()
+    return liked, like_count
 
 
 class ThreadLike(models.Model):
@@ -203,19 +396,31 @@ class ThreadLike(models.Model):
     with additional metadata (timestamps).
     """
     id = models.AutoField(primary_key=True)
-    thread_id = models.ForeignKey(Thread, on_delete=models.CASCADE, db_column='thread_id')
-    user_id = models.ForeignKey(User, on_delete=models.CASCADE, db_column='user_id')
+    # Both FKs lead a composite index below, so they skip Django's own FK index
+    thread_id = models.ForeignKey(Thread, on_delete=models.CASCADE, db_column='thread_id', db_index=False)
+    user_id = models.ForeignKey(User, on_delete=models.CASCADE, db_column='user_id', db_index=False)
     status = models.BooleanField(default=True)
     create_time = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         db_table = 'thread_like'
-        unique_together = ('thread_id', 'user_id')
+        constraints = [
+            models.UniqueConstraint(fields=['thread_id', 'user_id'], name='thread_like_thread_user_uniq'),
+        ]
         ordering = ['-create_time']
+        indexes = [
+            models.Index(fields=['thread_id', 'status'], name='thread_like_thread_status_idx'),
+            models.Index(fields=['user_id', 'status'], name='thread_like_user_status_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user_id.username} likes '{self.thread_id.title}'"
 
+    @classmethod
+    def toggle(cls, user, thread):
+        """Toggle the user's like on a thread; returns (liked, like_count)."""
+        return _toggle_like(cls, 'thread_id', thread, user)
+
 
 class ReplyLike(models.Model):
     """
@@ -225,19 +430,47 @@ class ReplyLike(models.Model):
     with additional metadata (timestamps).
     """
     id = models.AutoField(primary_key=True)
-    reply_id = models.ForeignKey(Reply, on_delete=models.CASCADE, db_column='reply_id')
-    user_id = models.ForeignKey(User, on_delete=models.CASCADE, db_column='user_id')
+    # Both FKs lead a composite index below, so they skip Django's own FK index
+    reply_id = models.ForeignKey(Reply, on_delete=models.CASCADE, db_column='reply_id', db_index=False)
+    user_id = models.ForeignKey(User, on_delete=models.CASCADE, db_column='user_id', db_index=False)
     status = models.BooleanField(default=True)
     create_time = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         db_table = 'reply_like'
-        unique_together = ('reply_id', 'user_id')
+        constraints = [
+            models.UniqueConstraint(fields=['reply_id', 'user_id'], name='reply_like_reply_user_uniq'),
+        ]
         ordering = ['-create_time']
+        indexes = [
+            models.Index(fields=['reply_id', 'status'], name='reply_like_reply_status_idx'),
+            models.Index(fields=['user_id', 'status'], name='reply_like_user_status_idx'),
+        ]
     
     def __str__(self):
         return f"{self.user_id.username} likes reply to '{self.reply_id.thread_id.title}'"
 
+    @classmethod
+    def toggle(cls, user, reply):
+        """Toggle the user's like on a reply; returns (liked, like_count)."""
+        liked, like_count = _toggle_like(cls, 'reply_id', reply, user)
+        # Keep the denormalized Reply.like_count (used for popular ordering) in step
+        if liked:
+            Reply.increment_likes(reply.pk)
+        else:
+            Reply.decrement_likes(reply.pk)
+        return liked, like_count
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        Reply.sync_like_counts([self.reply_id_id])
+        return result
+    
+    @classmethod
+    def sync_counts_liked_by(cls, user):
+        """Resync Reply.like_count after bulk status updates for a user's likes."""
+        Reply.sync_like_counts(cls.objects.filter(user_id=user).values('reply_id'))
+
 
 
 class ThreadView(models.Model):
@@ -252,8 +485,23 @@ class ThreadView(models.Model):
 
     class Meta:
         db_table = 'thread_view'
-        unique_together = ('user_id', 'thread_id')
+        constraints = [
+            models.UniqueConstraint(fields=['user_id', 'thread_id'], name='thread_view_user_thread_uniq'),
+        ]
         ordering = ['-viewed_at']
+        indexes = [
+            models.Index(fields=['user_id', '-viewed_at'], name='thread_view_user_viewed_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.user_id.username} viewed '{self.thread_id.title}' at {self.viewed_at}"
\ No newline at end of file
+        return f"{self.user_id.username} viewed '{self.thread_id.title}' at {self.viewed_at}"
+    
+    @classmethod
+    def record(cls, user, thread):
+        """Upsert the user's latest view of the thread in a single INSERT ... ON CONFLICT."""
+        cls.objects.bulk_create(
+            [cls(user_id=user, thread_id=thread)],
+            update_conflicts=True,
+            unique_fields=['user_id', 'thread_id'],
+            update_fields=['viewed_at'],
+        )
\ No newline at end of file
@@ -6,31 +6,72 @@ Category, Tag, and related models. Tests cover model creation, validation,
 relationships, and business logic.
 """
 
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError
+from django.db import IntegrityError, connection, transaction
 from django.utils import timezone
 from datetime import datetime, timedelta
 from unittest.mock import patch
+import base64
 
+from .authentication import EmailBackend, find_user_by_login
+from .email_service import EmailEncryption, MailjetEmailService, _get_cipher, email_service
 from .models import (
     User, Category, Tag, Thread, Reply, ThreadTags, 
     ThreadLike, ReplyLike, ThreadView
 )
 
 
+class ForumFixtureTestCase(TestCase):
+    """Base class providing the shared test user and category."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data."""
+        # None of these tests log in, so the password hasher is skipped
+        cls.user = User(username='testuser', email='test@example.com')
+        cls.user.set_unusable_password()
+        cls.user.save()
+        cls.anonymous_name = f"Anonymous#{cls.user.id}"
+        cls.category = Category.objects.create(name='Academic')
+
+
+class ThreadFixtureTestCase(ForumFixtureTestCase):
+    """Base class additionally providing a thread owned by the test user."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data."""
+        super().setUpTestData()
+        cls.thread = Thread.objects.create(
+            user_id=cls.user,
+            category_id=cls.category,
+            title='Test Thread',
+            body='Test body'
+        )
+
+
 class UserModelTest(TestCase):
     """Test cases for User model."""
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        self.user_data = {
+        cls.user_data = {
             'username': 'testuser',
             'email': 'test@example.com',
             'password': 'testpass123'
         }
     
+    def _save_user(self):
+        """Save the test user without hashing a password; used where nothing authenticates."""
+        user = User(username=self.user_data['username'], email=self.user_data['email'])
+        user.set_unusable_password()
+        user.save()
+        return user
+    
     def test_user_creation(self):
         """Test basic user creation."""
         user = User.objects.create_user(**self.user_data)
@@ -39,79 +80,49 @@ class UserModelTest(TestCase):
         self.assertFalse(user.is_anonymous)
         self.assertFalse(user.is_admin)
         self.assertFalse(user.is_banned)
-        self.assertIsNotNone(user.create_time)
-        self.assertIsNotNone(user.update_time)
     
-    def test_user_str_representation(self):
-        """Test user string representation."""
-        user = User.objects.create_user(**self.user_data)
-        self.assertEqual(str(user), 'testuser')
-    
-    def test_user_email_methods(self):
-        """Test email getter and setter methods."""
-        user = User.objects.create_user(**self.user_data)
+    def test_user_save_invalidates_meta_cache(self):
+        """Test only saves touching cached fields drop the cached user meta."""
+        user = self._save_user()
+        User.load_meta(user.pk)
         
-        # Test get_email
-        self.assertEqual(user.get_email(), 'test@example.com')
+        user.last_login = timezone.now()
+        user.save(update_fields=['last_login'])
+        self.assertIsNotNone(cache.get(User.meta_cache_key(user.pk)))
         
-        # Test set_email
-        user.set_email('newemail@example.com')
-        self.assertEqual(user.email, 'newemail@example.com')
+        user.is_banned = True
+        user.save(update_fields=['is_banned'])
+        self.assertIsNone(cache.get(User.meta_cache_key(user.pk)))
     
-    def test_user_anonymous_mode(self):
-        """Test anonymous mode functionality."""
-        user = User.objects.create_user(**self.user_data)
+    def test_user_flag_and_bio_fields(self):
+        """Test the anonymous/admin/ban flags and bio default and persist together."""
+        user = self._save_user()
         
-        # Test default anonymous mode
+        # Test defaults
         self.assertFalse(user.is_anonymous)
-        
-        # Test enabling anonymous mode
-        user.is_anonymous = True
-        user.save()
-        self.assertTrue(user.is_anonymous)
-    
-    def test_user_admin_status(self):
-        """Test admin status functionality."""
-        user = User.objects.create_user(**self.user_data)
-        
-        # Test default admin status
         self.assertFalse(user.is_admin)
-        
-        # Test making user admin
-        user.is_admin = True
-        user.save()
-        self.assertTrue(user.is_admin)
-    
-    def test_user_ban_status(self):
-        """Test ban status functionality."""
-        user = User.objects.create_user(**self.user_data)
-        
-        # Test default ban status
         self.assertFalse(user.is_banned)
-        
-        # Test banning user
-        user.is_banned = True
-        user.save()
-        self.assertTrue(user.is_banned)
-    
-    def test_user_bio_field(self):
-        """Test bio field functionality."""
-        user = User.objects.create_user(**self.user_data)
-        
-        # Test empty bio
         self.assertIsNone(user.bio)
         
-        # Test setting bio
+        # Test setting every field in one narrowed UPDATE
         bio_text = "This is a test bio for the user."
+        user.is_anonymous = True
+        user.is_admin = True
+        user.is_banned = True
         user.bio = bio_text
-        user.save()
+        user.save(update_fields=['is_anonymous', 'is_admin', 'is_banned', 'bio'])
+        user.refresh_from_db()
+        self.assertTrue(user.is_anonymous)
+        self.assertTrue(user.is_admin)
+        self.assertTrue(user.is_banned)
         self.assertEqual(user.bio, bio_text)
         
         # Test bio length limit - Django allows saving but validation should catch it
         long_bio = "x" * 301  # Exceeds 300 character limit
         user.bio = long_bio
-        user.save()  # Django allows saving
+        user.save(update_fields=['bio'])  # Django allows saving
         # The validation would be handled at the form/serializer level
+        user.refresh_from_db()
         self.assertEqual(len(user.bio), 301)
     
     def test_user_unique_constraints(self):
@@ -119,7 +130,7 @@ class UserModelTest(TestCase):
         User.objects.create_user(**self.user_data)
         
         # Test duplicate username
-        with self.assertRaises(IntegrityError):
+        with self.assertRaises(IntegrityError), transaction.atomic():
             User.objects.create_user(
                 username='testuser',
                 email='different@example.com',
@@ -136,7 +147,7 @@ class UserModelTest(TestCase):
         User.objects.create_user(**user2_data)
         
         # Now try to create another user with the same email
-        with self.assertRaises(IntegrityError):
+        with self.assertRaises(IntegrityError), transaction.atomic():
             User.objects.create_user(
                 username='anotheruser',
                 email='test@example.com',
@@ -144,12 +155,94 @@ class UserModelTest(TestCase):
             )
 
 
+class EmailBackendTest(TestCase):
+    """Test cases for the email/username authentication backend."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data."""
+        cls.backend = EmailBackend()
+        cls.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+    
+    def tearDown(self):
+        """Clean up after each test."""
+        cache.clear()
+    
+    def test_authenticate_by_email_or_username(self):
+        """Test login works with either the email or the username."""
+        self.assertEqual(self.backend.authenticate(None, username='test@example.com', password='testpass123'), self.user)
+        self.assertEqual(self.backend.authenticate(None, username='testuser', password='testpass123'), self.user)
+        self.assertIsNone(self.backend.authenticate(None, username='testuser', password='wrong'))
+    
+    def test_email_match_wins_over_username_match(self):
+        """Test an email match takes precedence over another user's identical username."""
+        User.objects.create_user(
+            username='test@example.com',
+            email='other@example.com',
+            password='otherpass123'
+        )
+        self.assertEqual(find_user_by_login('test@example.com'), self.user)
+        self.assertIsNone(find_user_by_login('nobody@example.com'))
+
+
+class EmailEncryptionTest(TestCase):
+    """Test cases for email address encryption."""
+    
+    def test_round_trip(self):
+        """Test an encrypted email decrypts back and is randomized per call."""
+        encryption = EmailEncryption()
+        first = encryption.encrypt_email('test@example.com')
+        second = encryption.encrypt_email('test@example.com')
+        self.assertNotEqual(first, second)
+        self.assertNotIn('@', first)
+        self.assertEqual(encryption.decrypt_email(first), 'test@example.com')
+    
+    def test_decrypts_legacy_fernet_values(self):
+        """Test values written by the previous Fernet scheme still decrypt."""
+        legacy = base64.b64encode(_get_cipher().encrypt(b'old@example.com')).decode()
+        self.assertEqual(EmailEncryption().decrypt_email(legacy), 'old@example.com')
+        bare = _get_cipher().encrypt(b'bare@example.com').decode()
+        self.assertEqual(EmailEncryption().decrypt_email(bare), 'bare@example.com')
+
+
+class MailjetBatchTest(TestCase):
+    """Test cases for batched Mailjet sends."""
+    
+    @patch('forum.email_service.requests.Session.post')
+    def test_send_batch_chunks_messages(self, mock_post):
+        """Test messages are posted at most 50 per request with the default sender."""
+        mock_post.return_value.status_code = 200
+        service = MailjetEmailService()
+        service.enabled = True
+        messages = [{'To': [{'Email': f'user{i}@example.com'}], 'Subject': 'Hi'} for i in range(120)]
+        
+        results = service.send_batch(messages)
+        
+        self.assertEqual([r.count for r in results], [50, 50, 20])
+        self.assertTrue(all(r.success for r in results))
+        first_payload = mock_post.call_args_list[0].kwargs['json']['Messages']
+        self.assertEqual(first_payload[0]['From']['Email'], service.from_email)
+    
+    def test_override_settings_reaches_cached_config(self):
+        """Test memoized Mailjet settings and the shared service follow override_settings."""
+        with override_settings(MAILJET_FROM_EMAIL='override@example.com', EMAIL_RATE_LIMIT_SECONDS=42):
+            self.assertEqual(MailjetEmailService().from_email, 'override@example.com')
+            self.assertEqual(email_service.mailjet_service.from_email, 'override@example.com')
+            self.assertEqual(email_service.rate_limit_seconds, 42)
+        self.assertNotEqual(email_service.mailjet_service.from_email, 'override@example.com')
+
+
 class CategoryModelTest(TestCase):
     """Test cases for Category model."""
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        self.category_data = {'name': 'Academic'}
+        cls.category_data = {'name': 'Academic'}
     
     def test_category_creation(self):
         """Test basic category creation."""
@@ -157,16 +250,11 @@ class CategoryModelTest(TestCase):
         self.assertEqual(category.name, 'Academic')
         self.assertIsNotNone(category.id)
     
-    def test_category_str_representation(self):
-        """Test category string representation."""
-        category = Category.objects.create(**self.category_data)
-        self.assertEqual(str(category), 'Academic')
-    
     def test_category_unique_constraint(self):
         """Test unique constraint on category name."""
         Category.objects.create(**self.category_data)
         
-        with self.assertRaises(IntegrityError):
+        with self.assertRaises(IntegrityError), transaction.atomic():
             Category.objects.create(name='Academic')
     
     def test_category_get_absolute_url(self):
@@ -180,9 +268,10 @@ class CategoryModelTest(TestCase):
 class TagModelTest(TestCase):
     """Test cases for Tag model."""
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        self.tag_data = {'name': 'python'}
+        cls.tag_data = {'name': 'python'}
     
     def test_tag_creation(self):
         """Test basic tag creation."""
@@ -190,11 +279,6 @@ class TagModelTest(TestCase):
         self.assertEqual(tag.name, 'python')
         self.assertTrue(tag.is_active)
     
-    def test_tag_str_representation(self):
-        """Test tag string representation."""
-        tag = Tag.objects.create(**self.tag_data)
-        self.assertEqual(str(tag), 'python')
-    
     def test_tag_active_status(self):
         """Test tag active status functionality."""
         tag = Tag.objects.create(**self.tag_data)
@@ -214,20 +298,16 @@ class TagModelTest(TestCase):
         # Note: This test assumes URL pattern exists
 
 
-class ThreadModelTest(TestCase):
+class ThreadModelTest(ForumFixtureTestCase):
     """Test cases for Thread model."""
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        self.user = User.objects.create_user(
-            username='testuser',
-            email='test@example.com',
-            password='testpass123'
-        )
-        self.category = Category.objects.create(name='Academic')
-        self.thread_data = {
-            'user_id': self.user,
-            'category_id': self.category,
+        super().setUpTestData()
+        cls.thread_data = {
+            'user_id': cls.user,
+            'category_id': cls.category,
             'title': 'Test Thread Title',
             'body': 'This is a test thread body content.'
         }
@@ -241,13 +321,6 @@ class ThreadModelTest(TestCase):
         self.assertEqual(thread.category_id, self.category)
         self.assertFalse(thread.is_anonymous)
         self.assertFalse(thread.is_deleted)
-        self.assertIsNotNone(thread.create_time)
-        self.assertIsNotNone(thread.edit_time)
-    
-    def test_thread_str_representation(self):
-        """Test thread string representation."""
-        thread = Thread.objects.create(**self.thread_data)
-        self.assertEqual(str(thread), 'Test Thread Title')
     
     def test_thread_get_absolute_url(self):
         """Test thread absolute URL generation."""
@@ -259,6 +332,10 @@ class ThreadModelTest(TestCase):
         """Test author display name for normal (non-anonymous) thread."""
         thread = Thread.objects.create(**self.thread_data)
         self.assertEqual(thread.get_author_display_name(), 'testuser')
+        # With the author joined in, the username needs no extra query
+        thread = Thread.objects.select_related('user_id').get(pk=thread.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(thread.get_author_display_name(), 'testuser')
     
     def test_thread_author_display_name_anonymous(self):
         """Test author display name for anonymous thread."""
@@ -266,8 +343,10 @@ class ThreadModelTest(TestCase):
             **self.thread_data,
             is_anonymous=True
         )
-        expected_name = f"Anonymous#{self.user.id}"
-        self.assertEqual(thread.get_author_display_name(), expected_name)
+        self.assertEqual(thread.get_author_display_name(), self.anonymous_name)
+        thread = Thread.objects.get(pk=thread.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(thread.get_author_display_name(), self.anonymous_name)
     
     def test_thread_soft_delete(self):
         """Test thread soft delete functionality."""
@@ -312,55 +391,49 @@ class ThreadModelTest(TestCase):
         reply.refresh_from_db()
         self.assertFalse(reply.is_deleted)
     
+    def test_thread_visible_to(self):
+        """Test soft-deleted threads are only visible to admins who ask for them."""
+        visible = Thread.objects.create(**self.thread_data)
+        deleted = Thread.objects.create(**self.thread_data)
+        deleted.soft_delete()
+        admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='adminpass123', is_admin=True
+        )
+        
+        self.assertEqual(list(Thread.objects.visible_to(self.user, include_deleted=True)), [visible])
+        self.assertEqual(list(Thread.objects.visible_to(admin)), [visible])
+        self.assertEqual(set(Thread.objects.visible_to(admin, include_deleted=True)), {visible, deleted})
+
+
+class ThreadValidationTest(SimpleTestCase):
+    """Test cases for Thread field length validation on unsaved instances."""
+    
+    # Validating the foreign keys would look the rows up, so they are excluded
     def test_thread_title_length_validation(self):
         """Test thread title length validation."""
         long_title = "x" * 121  # Exceeds 120 character limit
-        
-        # Create thread data without title first
-        thread_data = {
-            'user_id': self.user,
-            'category_id': self.category,
-            'body': 'Test body'
-        }
+        thread = Thread(title=long_title, body='Test body')
         
         with self.assertRaises(ValidationError):
-            thread = Thread.objects.create(**thread_data, title=long_title)
-            thread.full_clean()
+            thread.full_clean(exclude=['user_id', 'category_id'])
     
     def test_thread_body_length_validation(self):
         """Test thread body length validation."""
         long_body = "x" * 2001  # Exceeds 2000 character limit
-        
-        # Create thread data without body first
-        thread_data = {
-            'user_id': self.user,
-            'category_id': self.category,
-            'title': 'Test title'
-        }
+        thread = Thread(title='Test title', body=long_body)
         
         with self.assertRaises(ValidationError):
-            thread = Thread.objects.create(**thread_data, body=long_body)
-            thread.full_clean()
+            thread.full_clean(exclude=['user_id', 'category_id'])
 
 
-class ThreadTagsModelTest(TestCase):
+class ThreadTagsModelTest(ThreadFixtureTestCase):
     """Test cases for ThreadTags model."""
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        self.user = User.objects.create_user(
-            username='testuser',
-            email='test@example.com',
-            password='testpass123'
-        )
-        self.category = Category.objects.create(name='Academic')
-        self.thread = Thread.objects.create(
-            user_id=self.user,
-            category_id=self.category,
-            title='Test Thread',
-            body='Test body'
-        )
-        self.tag = Tag.objects.create(name='python')
+        super().setUpTestData()
+        cls.tag = Tag.objects.create(name='python')
     
     def test_thread_tags_creation(self):
         """Test basic thread-tag relationship creation."""
@@ -371,15 +444,6 @@ class ThreadTagsModelTest(TestCase):
         self.assertEqual(thread_tag.thread_id, self.thread)
         self.assertEqual(thread_tag.tag_id, self.tag)
     
-    def test_thread_tags_str_representation(self):
-        """Test thread-tag string representation."""
-        thread_tag = ThreadTags.objects.create(
-            thread_id=self.thread,
-            tag_id=self.tag
-        )
-        expected_str = f"'{self.thread.title}' tagged with '{self.tag.name}'"
-        self.assertEqual(str(thread_tag), expected_str)
-    
     def test_thread_tags_unique_constraint(self):
         """Test unique constraint on thread-tag relationship."""
         ThreadTags.objects.create(
@@ -387,33 +451,23 @@ class ThreadTagsModelTest(TestCase):
             tag_id=self.tag
         )
         
-        with self.assertRaises(IntegrityError):
+        with self.assertRaises(IntegrityError), transaction.atomic():
             ThreadTags.objects.create(
                 thread_id=self.thread,
                 tag_id=self.tag
             )
 
 
-class ReplyModelTest(TestCase):
+class ReplyModelTest(ThreadFixtureTestCase):
     """Test cases for Reply model."""
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        self.user = User.objects.create_user(
-            username='testuser',
-            email='test@example.com',
-            password='testpass123'
-        )
-        self.category = Category.objects.create(name='Academic')
-        self.thread = Thread.objects.create(
-            user_id=self.user,
-            category_id=self.category,
-            title='Test Thread',
-            body='Test body'
-        )
-        self.reply_data = {
-            'thread_id': self.thread,
-            'user_id': self.user,
+        super().setUpTestData()
+        cls.reply_data = {
+            'thread_id': cls.thread,
+            'user_id': cls.user,
             'body': 'This is a test reply.'
         }
     
@@ -426,19 +480,15 @@ class ReplyModelTest(TestCase):
         self.assertFalse(reply.is_anonymous)
         self.assertFalse(reply.is_deleted)
         self.assertEqual(reply.like_count, 0)
-        self.assertIsNotNone(reply.create_time)
-        self.assertIsNotNone(reply.edit_time)
-    
-    def test_reply_str_representation(self):
-        """Test reply string representation."""
-        reply = Reply.objects.create(**self.reply_data)
-        expected_str = f"Reply to '{self.thread.title}' by {self.user.username}"
-        self.assertEqual(str(reply), expected_str)
     
     def test_reply_author_display_name_normal(self):
         """Test author display name for normal (non-anonymous) reply."""
         reply = Reply.objects.create(**self.reply_data)
         self.assertEqual(reply.get_author_display_name(), 'testuser')
+        # With the author joined in, the username needs no extra query
+        reply = Reply.objects.select_related('user_id').get(pk=reply.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(reply.get_author_display_name(), 'testuser')
     
     def test_reply_author_display_name_anonymous(self):
         """Test author display name for anonymous reply."""
@@ -446,8 +496,10 @@ class ReplyModelTest(TestCase):
             **self.reply_data,
             is_anonymous=True
         )
-        expected_name = f"Anonymous#{self.user.id}"
-        self.assertEqual(reply.get_author_display_name(), expected_name)
+        self.assertEqual(reply.get_author_display_name(), self.anonymous_name)
+        reply = Reply.objects.get(pk=reply.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(reply.get_author_display_name(), self.anonymous_name)
     
     def test_reply_soft_delete(self):
         """Test reply soft delete functionality."""
@@ -483,24 +535,9 @@ class ReplyModelTest(TestCase):
         self.assertEqual(reply.like_count, 5)
 
 
-class ThreadLikeModelTest(TestCase):
+class ThreadLikeModelTest(ThreadFixtureTestCase):
     """Test cases for ThreadLike model."""
     
-    def setUp(self):
-        """Set up test data."""
-        self.user = User.objects.create_user(
-            username='testuser',
-            email='test@example.com',
-            password='testpass123'
-        )
-        self.category = Category.objects.create(name='Academic')
-        self.thread = Thread.objects.create(
-            user_id=self.user,
-            category_id=self.category,
-            title='Test Thread',
-            body='Test body'
-        )
-    
     def test_thread_like_creation(self):
         """Test basic thread like creation."""
         thread_like = ThreadLike.objects.create(
@@ -510,16 +547,6 @@ class ThreadLikeModelTest(TestCase):
         self.assertEqual(thread_like.thread_id, self.thread)
         self.assertEqual(thread_like.user_id, self.user)
         self.assertTrue(thread_like.status)
-        self.assertIsNotNone(thread_like.create_time)
-    
-    def test_thread_like_str_representation(self):
-        """Test thread like string representation."""
-        thread_like = ThreadLike.objects.create(
-            thread_id=self.thread,
-            user_id=self.user
-        )
-        expected_str = f"{self.user.username} likes '{self.thread.title}'"
-        self.assertEqual(str(thread_like), expected_str)
     
     def test_thread_like_unique_constraint(self):
         """Test unique constraint on thread-user like relationship."""
@@ -528,7 +555,7 @@ class ThreadLikeModelTest(TestCase):
             user_id=self.user
         )
         
-        with self.assertRaises(IntegrityError):
+        with self.assertRaises(IntegrityError), transaction.atomic():
             ThreadLike.objects.create(
                 thread_id=self.thread,
                 user_id=self.user
@@ -548,28 +575,26 @@ class ThreadLikeModelTest(TestCase):
         thread_like.status = False
         thread_like.save()
         self.assertFalse(thread_like.status)
+    
+    def test_thread_like_toggle_upsert(self):
+        """Test toggle inserts the like once and then flips its status."""
+        self.assertEqual(ThreadLike.toggle(self.user, self.thread), (True, 1))
+        self.assertEqual(ThreadLike.toggle(self.user, self.thread), (False, 0))
+        self.assertEqual(ThreadLike.toggle(self.user, self.thread), (True, 1))
+        self.assertEqual(ThreadLike.objects.filter(thread_id=self.thread, user_id=self.user).count(), 1)
+        self.assertIsNotNone(ThreadLike.objects.get(thread_id=self.thread, user_id=self.user).create_time)
 
 
-class ReplyLikeModelTest(TestCase):
+class ReplyLikeModelTest(ThreadFixtureTestCase):
     """Test cases for ReplyLike model."""
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        self.user = User.objects.create_user(
-            username='testuser',
-            email='test@example.com',
-            password='testpass123'
-        )
-        self.category = Category.objects.create(name='Academic')
-        self.thread = Thread.objects.create(
-            user_id=self.user,
-            category_id=self.category,
-            title='Test Thread',
-            body='Test body'
-        )
-        self.reply = Reply.objects.create(
-            thread_id=self.thread,
-            user_id=self.user,
+        super().setUpTestData()
+        cls.reply = Reply.objects.create(
+            thread_id=cls.thread,
+            user_id=cls.user,
             body='Test reply'
         )
     
@@ -582,16 +607,6 @@ class ReplyLikeModelTest(TestCase):
         self.assertEqual(reply_like.reply_id, self.reply)
         self.assertEqual(reply_like.user_id, self.user)
         self.assertTrue(reply_like.status)
-        self.assertIsNotNone(reply_like.create_time)
-    
-    def test_reply_like_str_representation(self):
-        """Test reply like string representation."""
-        reply_like = ReplyLike.objects.create(
-            reply_id=self.reply,
-            user_id=self.user
-        )
-        expected_str = f"{self.user.username} likes reply to '{self.thread.title}'"
-        self.assertEqual(str(reply_like), expected_str)
     
     def test_reply_like_unique_constraint(self):
         """Test unique constraint on reply-user like relationship."""
@@ -600,7 +615,7 @@ class ReplyLikeModelTest(TestCase):
             user_id=self.user
         )
         
-        with self.assertRaises(IntegrityError):
+        with self.assertRaises(IntegrityError), transaction.atomic():
             ReplyLike.objects.create(
                 reply_id=self.reply,
                 user_id=self.user
@@ -620,26 +635,42 @@ class ReplyLikeModelTest(TestCase):
         reply_like.status = False
         reply_like.save()
         self.assertFalse(reply_like.status)
+    
+    def test_reply_like_toggle_maintains_like_count(self):
+        """Test toggling a reply like keeps the stored like_count in step."""
+        other = User.objects.create_user(username='other', email='other@example.com', password='testpass123')
+        ReplyLike.toggle(self.user, self.reply)
+        ReplyLike.toggle(other, self.reply)
+        self.reply.refresh_from_db()
+        self.assertEqual(self.reply.like_count, 2)
+        
+        ReplyLike.toggle(self.user, self.reply)
+        self.reply.refresh_from_db()
+        self.assertEqual(self.reply.like_count, 1)
+        
+        ReplyLike.objects.filter(user_id=other).update(status=False)
+        ReplyLike.sync_counts_liked_by(other)
+        self.reply.refresh_from_db()
+        self.assertEqual(self.reply.like_count, 0)
+    
+    def test_reply_like_count_resynced_on_delete(self):
+        """Test like_count drops when a like is deleted directly or by user cascade."""
+        other = User.objects.create_user(username='other', email='other@example.com', password='testpass123')
+        ReplyLike.toggle(self.user, self.reply)
+        ReplyLike.toggle(other, self.reply)
+        
+        ReplyLike.objects.get(user_id=self.user).delete()
+        self.reply.refresh_from_db()
+        self.assertEqual(self.reply.like_count, 1)
+        
+        other.delete()
+        self.reply.refresh_from_db()
+        self.assertEqual(self.reply.like_count, 0)
 
 
-class ThreadViewModelTest(TestCase):
+class ThreadViewModelTest(ThreadFixtureTestCase):
     """Test cases for ThreadView model."""
     
-    def setUp(self):
-        """Set up test data."""
-        self.user = User.objects.create_user(
-            username='testuser',
-            email='test@example.com',
-            password='testpass123'
-        )
-        self.category = Category.objects.create(name='Academic')
-        self.thread = Thread.objects.create(
-            user_id=self.user,
-            category_id=self.category,
-            title='Test Thread',
-            body='Test body'
-        )
-    
     def test_thread_view_creation(self):
         """Test basic thread view creation."""
         thread_view = ThreadView.objects.create(
@@ -648,35 +679,23 @@ class ThreadViewModelTest(TestCase):
         )
         self.assertEqual(thread_view.user_id, self.user)
         self.assertEqual(thread_view.thread_id, self.thread)
-        self.assertIsNotNone(thread_view.viewed_at)
-    
-    def test_thread_view_str_representation(self):
-        """Test thread view string representation."""
-        thread_view = ThreadView.objects.create(
-            user_id=self.user,
-            thread_id=self.thread
-        )
-        expected_str = f"{self.user.username} viewed '{self.thread.title}' at {thread_view.viewed_at}"
-        self.assertEqual(str(thread_view), expected_str)
     
     def test_thread_view_unique_constraint(self):
         """Test unique constraint on user-thread view relationship."""
-        ThreadView.objects.create(
+        first = ThreadView.objects.create(
             user_id=self.user,
             thread_id=self.thread
         )
         
         # Creating another view should update the existing one
-        # This tests the upsert behavior
-        from django.utils import timezone
-        from datetime import timedelta
-        
-        new_time = timezone.now() + timedelta(hours=1)
-        ThreadView.objects.update_or_create(
-            user_id=self.user,
-            thread_id=self.thread,
-            defaults={'viewed_at': new_time}
-        )
+        # This tests the upsert behavior (a single INSERT ... ON CONFLICT)
+        with self.assertNumQueries(1):
+            ThreadView.objects.bulk_create(
+                [ThreadView(user_id=self.user, thread_id=self.thread)],
+                update_conflicts=True,
+                update_fields=['viewed_at'],
+                unique_fields=['user_id', 'thread_id'],
+            )
         
         # Should only have one record
         self.assertEqual(ThreadView.objects.count(), 1)
@@ -686,192 +705,151 @@ class ThreadViewModelTest(TestCase):
             user_id=self.user,
             thread_id=self.thread
         )
-        self.assertIsNotNone(thread_view.viewed_at)
+        self.assertEqual(thread_view.pk, first.pk)
+        self.assertGreaterEqual(thread_view.viewed_at, first.viewed_at)
+    
+    def test_thread_view_record_upserts(self):
+        """Test record() inserts once and then refreshes viewed_at in place."""
+        ThreadView.record(self.user, self.thread)
+        first = ThreadView.objects.get(user_id=self.user, thread_id=self.thread)
+        
+        with self.assertNumQueries(1):
+            ThreadView.record(self.user, self.thread)
+        
+        second = ThreadView.objects.get(user_id=self.user, thread_id=self.thread)
+        self.assertEqual(ThreadView.objects.count(), 1)
+        self.assertEqual(second.pk, first.pk)
+        self.assertGreaterEqual(second.viewed_at, first.viewed_at)
 
 
-class ModelRelationshipTest(TestCase):
-    """Test cases for model relationships and cascading behavior."""
+class ModelRepresentationTest(ThreadFixtureTestCase):
+    """Test cases for __str__ and automatic timestamps across all models."""
     
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test data."""
-        self.user = User.objects.create_user(
-            username='testuser',
-            email='test@example.com',
-            password='testpass123'
+        super().setUpTestData()
+        cls.tag = Tag.objects.create(name='python')
+        cls.reply = Reply.objects.create(
+            thread_id=cls.thread,
+            user_id=cls.user,
+            body='Test reply'
         )
-        self.category = Category.objects.create(name='Academic')
-        self.tag = Tag.objects.create(name='python')
+        cls.thread_tag = ThreadTags.objects.create(thread_id=cls.thread, tag_id=cls.tag)
+        cls.thread_like = ThreadLike.objects.create(thread_id=cls.thread, user_id=cls.user)
+        cls.reply_like = ReplyLike.objects.create(reply_id=cls.reply, user_id=cls.user)
+        cls.thread_view = ThreadView.objects.create(user_id=cls.user, thread_id=cls.thread)
+    
+    def test_str_representations(self):
+        """Test the string representation of every model."""
+        cases = [
+            (self.user, 'testuser'),
+            (self.category, 'Academic'),
+            (self.tag, 'python'),
+            (self.thread, 'Test Thread'),
+            (self.thread_tag, "'Test Thread' tagged with 'python'"),
+            (self.reply, "Reply to 'Test Thread' by testuser"),
+            (self.thread_like, "testuser likes 'Test Thread'"),
+            (self.reply_like, "testuser likes reply to 'Test Thread'"),
+            (self.thread_view, f"testuser viewed 'Test Thread' at {self.thread_view.viewed_at}"),
+        ]
+        for obj, expected_str in cases:
+            with self.subTest(model=type(obj).__name__):
+                self.assertEqual(str(obj), expected_str)
+    
+    def test_auto_timestamps_set(self):
+        """Test auto_now/auto_now_add timestamps are filled in on create."""
+        cases = [
+            (self.user, ['create_time', 'update_time']),
+            (self.thread, ['create_time', 'edit_time']),
+            (self.reply, ['create_time', 'edit_time']),
+            (self.thread_like, ['create_time']),
+            (self.reply_like, ['create_time']),
+            (self.thread_view, ['viewed_at']),
+        ]
+        for obj, fields in cases:
+            for field in fields:
+                with self.subTest(model=type(obj).__name__, field=field):
+                    self.assertIsNotNone(getattr(obj, field))
+
+
+class ModelRelationshipTest(ForumFixtureTestCase):
+    """Test cases for model relationships and cascading behavior."""
     
-    def test_user_thread_cascade_delete(self):
-        """Test that deleting a user cascades to their threads."""
-        thread = Thread.objects.create(
-            user_id=self.user,
-            category_id=self.category,
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test data."""
+        super().setUpTestData()
+        cls.tag = Tag.objects.create(name='python')
+        # One thread carrying a row of every dependent model; each test deletes
+        # a different parent and its transaction is rolled back afterwards
+        cls.thread = Thread.objects.create(
+            user_id=cls.user,
+            category_id=cls.category,
             title='Test Thread',
             body='Test body'
         )
-        
+        cls.reply = Reply.objects.create(
+            thread_id=cls.thread,
+            user_id=cls.user,
+            body='Test reply'
+        )
+        cls.thread_tag = ThreadTags.objects.create(thread_id=cls.thread, tag_id=cls.tag)
+        cls.thread_like = ThreadLike.objects.create(thread_id=cls.thread, user_id=cls.user)
+        cls.reply_like = ReplyLike.objects.create(reply_id=cls.reply, user_id=cls.user)
+        cls.thread_view = ThreadView.objects.create(user_id=cls.user, thread_id=cls.thread)
+    
+    def test_user_thread_cascade_delete(self):
+        """Test that deleting a user cascades to their threads."""
         # Delete user
         self.user.delete()
         
         # Thread should be deleted
-        self.assertFalse(Thread.objects.filter(id=thread.id).exists())
+        self.assertFalse(Thread.objects.filter(id=self.thread.id).exists())
     
     def test_category_thread_cascade_delete(self):
         """Test that deleting a category cascades to threads."""
-        thread = Thread.objects.create(
-            user_id=self.user,
-            category_id=self.category,
-            title='Test Thread',
-            body='Test body'
-        )
-        
         # Delete category
         self.category.delete()
         
         # Thread should be deleted
-        self.assertFalse(Thread.objects.filter(id=thread.id).exists())
-    
-    def test_thread_reply_cascade_delete(self):
-        """Test that deleting a thread cascades to replies."""
-        thread = Thread.objects.create(
-            user_id=self.user,
-            category_id=self.category,
-            title='Test Thread',
-            body='Test body'
-        )
-        reply = Reply.objects.create(
-            thread_id=thread,
-            user_id=self.user,
-            body='Test reply'
-        )
-        
-        # Delete thread
-        thread.delete()
-        
-        # Reply should be deleted
-        self.assertFalse(Reply.objects.filter(id=reply.id).exists())
-    
-    def test_thread_tags_cascade_delete(self):
-        """Test that deleting a thread cascades to thread-tag relationships."""
-        thread = Thread.objects.create(
-            user_id=self.user,
-            category_id=self.category,
-            title='Test Thread',
-            body='Test body'
-        )
-        thread_tag = ThreadTags.objects.create(
-            thread_id=thread,
-            tag_id=self.tag
-        )
-        
-        # Delete thread
-        thread.delete()
-        
-        # Thread-tag relationship should be deleted
-        self.assertFalse(ThreadTags.objects.filter(id=thread_tag.id).exists())
+        self.assertFalse(Thread.objects.filter(id=self.thread.id).exists())
     
-    def test_thread_like_cascade_delete(self):
-        """Test that deleting a thread cascades to thread likes."""
-        thread = Thread.objects.create(
-            user_id=self.user,
-            category_id=self.category,
-            title='Test Thread',
-            body='Test body'
-        )
-        thread_like = ThreadLike.objects.create(
-            thread_id=thread,
-            user_id=self.user
-        )
-        
+    def test_thread_cascade_delete(self):
+        """Test that deleting a thread cascades to everything hanging off it."""
         # Delete thread
-        thread.delete()
-        
-        # Thread like should be deleted
-        self.assertFalse(ThreadLike.objects.filter(id=thread_like.id).exists())
-    
-    def test_reply_like_cascade_delete(self):
-        """Test that deleting a reply cascades to reply likes."""
-        thread = Thread.objects.create(
-            user_id=self.user,
-            category_id=self.category,
-            title='Test Thread',
-            body='Test body'
-        )
-        reply = Reply.objects.create(
-            thread_id=thread,
-            user_id=self.user,
-            body='Test reply'
-        )
-        reply_like = ReplyLike.objects.create(
-            reply_id=reply,
-            user_id=self.user
-        )
-        
-        # Delete reply
-        reply.delete()
-        
-        # Reply like should be deleted
-        self.assertFalse(ReplyLike.objects.filter(id=reply_like.id).exists())
-    
-    def test_thread_view_cascade_delete(self):
-        """Test that deleting a thread cascades to thread views."""
-        thread = Thread.objects.create(
-            user_id=self.user,
-            category_id=self.category,
-            title='Test Thread',
-            body='Test body'
-        )
-        thread_view = ThreadView.objects.create(
-            user_id=self.user,
-            thread_id=thread
-        )
-        
-        # Delete thread
-        thread.delete()
-        
-        # Thread view should be deleted
-        self.assertFalse(ThreadView.objects.filter(id=thread_view.id).exists())
+        self.thread.delete()
+        
+        # Replies, tag links, likes (including likes on the replies) and views should be deleted
+        self.assertFalse(Reply.objects.filter(id=self.reply.id).exists())
+        self.assertFalse(ThreadTags.objects.filter(id=self.thread_tag.id).exists())
+        self.assertFalse(ThreadLike.objects.filter(id=self.thread_like.id).exists())
+        self.assertFalse(ReplyLike.objects.filter(id=self.reply_like.id).exists())
+        self.assertFalse(ThreadView.objects.filter(id=self.thread_view.id).exists())
 
 
-class ModelValidationTest(TestCase):
-    """Test cases for model validation and edge cases."""
-    
-    def setUp(self):
-        """Set up test data."""
-        self.user = User.objects.create_user(
-            username='testuser',
-            email='test@example.com',
-            password='testpass123'
-        )
-        self.category = Category.objects.create(name='Academic')
+class ModelValidationUnitTest(SimpleTestCase):
+    """Test cases for field validation that need no database rows."""
     
     def test_empty_string_validation(self):
         """Test validation of empty strings."""
+        # The foreign keys are excluded: validating them would look the rows up
         # Test empty thread title
         with self.assertRaises(ValidationError):
-            thread = Thread.objects.create(
-                user_id=self.user,
-                category_id=self.category,
-                title='',
-                body='Test body'
-            )
-            thread.full_clean()
+            Thread(title='', body='Test body').full_clean(exclude=['user_id', 'category_id'])
         
         # Test empty thread body
         with self.assertRaises(ValidationError):
-            thread = Thread.objects.create(
-                user_id=self.user,
-                category_id=self.category,
-                title='Test title',
-                body=''
-            )
-            thread.full_clean()
+            Thread(title='Test title', body='').full_clean(exclude=['user_id', 'category_id'])
+
+
+class ModelValidationTest(ForumFixtureTestCase):
+    """Test cases for model validation and edge cases."""
     
     def test_null_field_validation(self):
         """Test validation of null fields."""
         # Test null thread title
-        with self.assertRaises(IntegrityError):
+        with self.assertRaises(IntegrityError), transaction.atomic():
             Thread.objects.create(
                 user_id=self.user,
                 category_id=self.category,
@@ -880,7 +858,7 @@ class ModelValidationTest(TestCase):
             )
         
         # Test null thread body
-        with self.assertRaises(IntegrityError):
+        with self.assertRaises(IntegrityError), transaction.atomic():
             Thread.objects.create(
                 user_id=self.user,
                 category_id=self.category,
@@ -890,27 +868,24 @@ class ModelValidationTest(TestCase):
     
     def test_foreign_key_validation(self):
         """Test foreign key validation."""
+        # Foreign keys are checked at commit, which a TestCase never reaches, so
+        # force the check inside a savepoint that rolls the bad row back
         # Test invalid user_id - create a thread with non-existent user
-        # This should fail at the database level
-        try:
+        with self.assertRaises(IntegrityError), transaction.atomic():
             Thread.objects.create(
                 user_id_id=99999,  # Non-existent user
                 category_id=self.category,
                 title='Test title',
                 body='Test body'
             )
-            self.fail("Expected IntegrityError for invalid user_id")
-        except IntegrityError:
-            pass  # Expected behavior
+            connection.check_constraints(table_names=[Thread._meta.db_table])
         
         # Test invalid category_id - create a thread with non-existent category
-        try:
+        with self.assertRaises(IntegrityError), transaction.atomic():
             Thread.objects.create(
                 user_id=self.user,
                 category_id_id=99999,  # Non-existent category
                 title='Test title',
                 body='Test body'
             )
-            self.fail("Expected IntegrityError for invalid category_id")
-        except IntegrityError:
-            pass  # Expected behavior
\ No newline at end of file
+            connection.check_constraints(table_names=[Thread._meta.db_table])
@@ -6,6 +6,7 @@ This script runs all tests and generates coverage reports to verify
 that we meet the 85% coverage requirement for key backend files.
 """
 
+import importlib.util
 import os
 import sys
 import subprocess
@@ -16,92 +17,91 @@ from django.test.utils import get_runner
 def setup_django():
     """Setup Django environment."""
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'DjangoProject.settings')
+    # Apply the test-only settings even though this is not `manage.py test`
+    os.environ.setdefault('DJANGO_TESTING', 'True')
     django.setup()
 
-def run_tests():
-    """Run all tests and generate coverage report."""
+# Run by default; pass test labels on the command line to run a subset instead
+DEFAULT_TEST_LABELS = ['forum.tests', 'api.tests', 'api.serializer_tests']
+
+def run_tests(test_labels=None):
+    """Run the tests and generate coverage report; returns the total coverage percentage, or None if tests failed."""
+    import coverage
+    
     print("Running backend tests...")
     
-    # Run tests with coverage
-    cmd = [
-        'coverage', 'run', '--source=forum,api', 
-        'manage.py', 'test', 'forum.tests', 'api.tests', 'api.serializer_tests',
-        '--verbosity=2'
-    ]
+    # Run the suite in this process under the coverage API, one test worker per
+    # CPU. Sources and the multiprocessing settings live in .coveragerc; each
+    # worker writes its own .coverage.* data file, merged by combine() below
+    cov = coverage.Coverage()
+    cov.erase()
+    cov.start()
+    # Django and the apps are imported after start() so module-level lines count
+    setup_django()
+    TestRunner = get_runner(settings)
+    # Stop at the first failure locally; CI runs everything to report every failure
+    test_runner = TestRunner(
+        verbosity=2,
+        parallel=os.cpu_count() or 1,
+        failfast=not os.environ.get('CI'),
+    )
+    failures = test_runner.run_tests(test_labels or DEFAULT_TEST_LABELS)
+    cov.stop()
+    cov.save()
+    # A fresh, never-started instance merges every worker's file into .coverage
+    cov = coverage.Coverage()
+    cov.combine()
+    cov.save()
     
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        print(result.stdout)
-        if result.stderr:
-            print("Errors:", result.stderr)
-        
-        if result.returncode != 0:
-            print("❌ Tests failed!")
-            return False
-        
-        print("✅ All tests passed!")
-        
-        # Generate coverage report
-        print("\n📊 Generating coverage report...")
-        coverage_cmd = ['coverage', 'report', '--show-missing']
-        coverage_result = subprocess.run(coverage_cmd, capture_output=True, text=True)
-        print(coverage_result.stdout)
-        
-        # Generate HTML coverage report
-        html_cmd = ['coverage', 'html']
-        subprocess.run(html_cmd, capture_output=True)
-        print("📁 HTML coverage report generated in htmlcov/")
-        
-        return True
-        
-    except FileNotFoundError:
+    if failures:
+        print("❌ Tests failed!")
+        return None
+    
+    print("✅ All tests passed!")
+    
+    # Generate coverage report
+    print("\n📊 Generating coverage report...")
+    percentage = cov.report(show_missing=True)
+    
+    # Generate HTML coverage report
+    cov.html_report()
+    print("📁 HTML coverage report generated in htmlcov/")
+    
+    return percentage
+
+def ensure_coverage_installed():
+    """Install coverage up front if missing; a failed install aborts before any test runs."""
+    if importlib.util.find_spec('coverage') is None:
         print("❌ Coverage tool not found. Installing coverage...")
-        subprocess.run([sys.executable, '-m', 'pip', 'install', 'coverage'])
-        return run_tests()
+        subprocess.check_call([sys.executable, '-m', 'pip', 'install', 'coverage'])
+        importlib.invalidate_caches()
 
-def check_coverage_threshold():
-    """Check if coverage meets the 85% threshold."""
-    try:
-        result = subprocess.run(['coverage', 'report'], capture_output=True, text=True)
-        lines = result.stdout.split('\n')
-        
-        for line in lines:
-            if 'TOTAL' in line:
-                # Extract percentage from line like "TOTAL                   1234    123    90%"
-                parts = line.split()
-                if len(parts) >= 4:
-                    percentage_str = parts[-1].replace('%', '')
-                    try:
-                        percentage = float(percentage_str)
-                        if percentage >= 85.0:
-                            print(f"✅ Coverage {percentage}% meets 85% threshold!")
-                            return True
-                        else:
-                            print(f"❌ Coverage {percentage}% below 85% threshold!")
-                            return False
-                    except ValueError:
-                        continue
-        
-        print("❌ Could not parse coverage percentage")
-        return False
-        
-    except Exception as e:
-        print(f"❌ Error checking coverage: {e}")
-        return False
+def check_coverage_threshold(percentage):
+    """Check if the total coverage percentage reported by run_tests() meets the 85% threshold."""
+    if percentage >= 85.0:
+        print(f"✅ Coverage {percentage:.1f}% meets 85% threshold!")
+        return True
+    print(f"❌ Coverage {percentage:.1f}% below 85% threshold!")
+    return False
 
 def main():
     """Main function."""
     print("Starting backend test suite...")
+    ensure_coverage_installed()
     
-    # Setup Django
-    setup_django()
-    
-    # Run tests
-    if not run_tests():
+    # Run tests (Django is set up inside, once coverage is recording)
+    test_labels = sys.argv[1:]
+    percentage = run_tests(test_labels)
+    if percentage is None:
         sys.exit(1)
     
+    # The threshold applies to the full suite only
+    if test_labels:
+        print("\nSelected tests passed (coverage threshold not checked for a partial run).")
+        return
+    
     # Check coverage threshold
-    if not check_coverage_threshold():
+    if not check_coverage_threshold(percentage):
         print("\nCoverage below threshold. Consider adding more tests.")
         sys.exit(1)
     
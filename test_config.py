@@ -5,10 +5,16 @@ This module provides test-specific settings and utilities
 to ensure consistent test environment setup.
 """
 
+import atexit
 import os
+import shutil
 import tempfile
+import threading
 from django.conf import settings
 
+from DjangoProject.test_utils import DisableMigrations
+
+
 # Test-specific settings
 TEST_SETTINGS = {
     'DEBUG': False,
@@ -24,6 +30,7 @@ TEST_SETTINGS = {
             'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         }
     },
+    'MIGRATION_MODULES': DisableMigrations(),
     'EMAIL_BACKEND': 'django.core.mail.backends.locmem.EmailBackend',
     'PASSWORD_HASHERS': [
         'django.contrib.auth.hashers.MD5PasswordHasher',
@@ -43,78 +50,126 @@ TEST_SETTINGS = {
             },
         },
     },
-    'MEDIA_ROOT': tempfile.mkdtemp(),
-    'STATIC_ROOT': tempfile.mkdtemp(),
 }
 
+# MEDIA_ROOT/STATIC_ROOT directories made by setup_test_environment() in this process
+_TEMP_DIRS = []
+
+# Background rmtree threads started by cleanup_test_data(), joined at exit
+_CLEANUP_THREADS = []
+
+
+def _join_cleanup_threads(timeout=5.0):
+    for thread in _CLEANUP_THREADS:
+        thread.join(timeout)
+
+
+atexit.register(_join_cleanup_threads)
+
+
+def _relax_sqlite_durability(sender, connection, **kwargs):
+    """Test databases are throwaway; skip fsyncs and keep temp tables in memory."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA synchronous=OFF')
+        cursor.execute('PRAGMA temp_store=MEMORY')
+        # 64 MiB page cache (negative = KiB) so the whole test schema stays resident
+        cursor.execute('PRAGMA cache_size=-65536')
+
+
 def setup_test_environment():
     """Setup test environment with test-specific settings."""
+    from django.db.backends.signals import connection_created
+    
     # Update settings with test configuration
     for key, value in TEST_SETTINGS.items():
         setattr(settings, key, value)
     
     # Ensure test database is used
     settings.DATABASES['default']['NAME'] = ':memory:'
+    connection_created.connect(_relax_sqlite_durability, dispatch_uid='test_config.sqlite_pragmas')
+    
+    # Scratch media/static directories are only created once actually needed, one
+    # pair per process, and removed at exit even if cleanup_test_data() never runs
+    if not _TEMP_DIRS:
+        for setting in ('MEDIA_ROOT', 'STATIC_ROOT'):
+            path = tempfile.mkdtemp(prefix=f'test_{setting.lower()}_{os.getpid()}_')
+            _TEMP_DIRS.append(path)
+            atexit.register(shutil.rmtree, path, ignore_errors=True)
+    settings.MEDIA_ROOT, settings.STATIC_ROOT = _TEMP_DIRS
     
     return settings
 
 def create_test_data():
     """Create test data for testing."""
-    from forum.models import User, Category, Tag, Thread, Reply
-    
-    # Create test users
-    test_user = User.objects.create_user(
-        username='testuser',
-        email='test@example.com',
-        password='testpass123'
-    )
-    
-    admin_user = User.objects.create_user(
-        username='admin',
-        email='admin@example.com',
-        password='adminpass123',
-        is_admin=True
-    )
-    
-    # Create test categories
-    academic_category = Category.objects.create(name='Academic')
-    social_category = Category.objects.create(name='Social')
-    
-    # Create test tags
-    python_tag = Tag.objects.create(name='python')
-    django_tag = Tag.objects.create(name='django')
-    inactive_tag = Tag.objects.create(name='inactive', is_active=False)
-    
-    # Create test threads
-    thread1 = Thread.objects.create(
-        user_id=test_user,
-        category_id=academic_category,
-        title='Python Programming Guide',
-        body='This is a comprehensive guide to Python programming.'
-    )
-    
-    thread2 = Thread.objects.create(
-        user_id=test_user,
-        category_id=social_category,
-        title='Social Discussion',
-        body='This is a social discussion thread.',
-        is_anonymous=True
-    )
-    
-    # Create test replies
-    reply1 = Reply.objects.create(
-        thread_id=thread1,
-        user_id=test_user,
-        body='Great tutorial! Thanks for sharing.'
-    )
-    
-    reply2 = Reply.objects.create(
-        thread_id=thread1,
-        user_id=admin_user,
-        body='This is very helpful.',
-        is_anonymous=True
-    )
+    from django.db import transaction
+    from forum.models import User, Category, Tag, Thread, Reply, bump_search_cache_version
     
+    # One transaction for the whole fixture set instead of a commit per row
+    with transaction.atomic():
+        # Create test users
+        test_user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        
+        admin_user = User.objects.create_user(
+            username='admin',
+            email='admin@example.com',
+            password='adminpass123',
+            is_admin=True
+        )
+        
+        # Create test categories
+        academic_category, social_category = Category.objects.bulk_create([
+            Category(name='Academic'),
+            Category(name='Social'),
+        ])
+        
+        # Create test tags (bulk_create skips Tag.save, so drop the cached list here)
+        python_tag, django_tag, inactive_tag = Tag.objects.bulk_create([
+            Tag(name='python'),
+            Tag(name='django'),
+            Tag(name='inactive', is_active=False),
+        ])
+        Tag.invalidate_list_cache()
+        
+        # Create test threads and replies, one INSERT per table, setting the raw
+        # FK columns; bulk_create skips save(), so bump the search cache version
+        # once afterwards
+        thread1, thread2 = Thread.objects.bulk_create([
+            Thread(
+                user_id_id=test_user.pk,
+                category_id_id=academic_category.pk,
+                title='Python Programming Guide',
+                body='This is a comprehensive guide to Python programming.'
+            ),
+            Thread(
+                user_id_id=test_user.pk,
+                category_id_id=social_category.pk,
+                title='Social Discussion',
+                body='This is a social discussion thread.',
+                is_anonymous=True
+            ),
+        ])
+        
+        reply1, reply2 = Reply.objects.bulk_create([
+            Reply(
+                thread_id_id=thread1.pk,
+                user_id_id=test_user.pk,
+                body='Great tutorial! Thanks for sharing.'
+            ),
+            Reply(
+                thread_id_id=thread1.pk,
+                user_id_id=admin_user.pk,
+                body='This is very helpful.',
+                is_anonymous=True
+            ),
+        ])
+        bump_search_cache_version()
+        
     return {
         'users': [test_user, admin_user],
         'categories': [academic_category, social_category],
@@ -128,9 +183,14 @@ def cleanup_test_data():
     from django.core.cache import cache
     cache.clear()
     
-    # Clean up temporary directories
-    import shutil
-    if hasattr(settings, 'MEDIA_ROOT'):
-        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
-    if hasattr(settings, 'STATIC_ROOT'):
-        shutil.rmtree(settings.STATIC_ROOT, ignore_errors=True)
+    # Clean up temporary directories (only the ones setup_test_environment() made)
+    # on a daemon thread so teardown is not held up by slow unlinks; the next
+    # setup_test_environment() call gets fresh directories
+    paths = list(_TEMP_DIRS)
+    _TEMP_DIRS.clear()
+    for path in paths:
+        thread = threading.Thread(
+            target=shutil.rmtree, args=(path,), kwargs={'ignore_errors': True}, daemon=True,
+        )
+        thread.start()
+        _CLEANUP_THREADS.append(thread)